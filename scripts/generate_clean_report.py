@@ -6,19 +6,27 @@ Supports multiple languages via static translations from translations.yaml
 
 import os
 import sys
+import tempfile
 from pathlib import Path
 from datetime import datetime
-from typing import Optional
+from functools import lru_cache
+from typing import Dict, Optional
 
 from src.data_models import PatientInfo, MicrobiomeData
 from src.chart_generator import ChartGenerator
 from src.csv_processor import CSVProcessor
-from jinja2 import Environment, Template
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, Template
 import yaml
 import logging
 import pandas as pd
 from weasyprint import HTML, CSS
 
+# libyaml's loader parses config/translations much faster than SafeLoader
+try:
+    from yaml import CSafeLoader as YAMLLoader
+except ImportError:
+    from yaml import SafeLoader as YAMLLoader
+
 # Configure logging FIRST
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -26,6 +34,51 @@ logger = logging.getLogger(__name__)
 # Supported languages
 SUPPORTED_LANGUAGES = ('en', 'pl', 'de')
 
+# Jinja2 environments keyed by resolved template directory. Compiled
+# templates are kept for the life of the process, so batch runs only parse
+# each page template once.
+_ENV_CACHE: Dict[str, Environment] = {}
+
+# Compiled template bytecode shared across processes (batch workers, reruns)
+BYTECODE_CACHE_DIR = Path(tempfile.gettempdir()) / "emr_jinja_bcc"
+
+
+def _bytecode_cache() -> Optional[FileSystemBytecodeCache]:
+    """Return the on-disk bytecode cache, or None if its directory is unusable."""
+    try:
+        BYTECODE_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    except OSError as e:
+        logger.warning(f"Template bytecode cache disabled: {e}")
+        return None
+    return FileSystemBytecodeCache(directory=str(BYTECODE_CACHE_DIR), pattern='__jinja2_%s.cache')
+
+
+def get_template_environment(template_dir) -> Environment:
+    """Return the shared Jinja2 environment for a template directory.
+
+    Templates are not re-checked for changes once loaded (auto_reload is off);
+    restart the process to pick up template edits. Compiled bytecode is also
+    stored on disk, so new processes skip compilation; Jinja2 keys it on the
+    template source checksum, so edited templates are recompiled.
+    """
+    key = str(Path(template_dir).resolve())
+    env = _ENV_CACHE.get(key)
+    if env is None:
+        env = _ENV_CACHE.setdefault(key, Environment(
+            loader=FileSystemLoader(key),
+            auto_reload=False,
+            cache_size=400,
+            bytecode_cache=_bytecode_cache(),
+        ))
+    return env
+
+
+@lru_cache(maxsize=8)
+def _load_yaml_file(config_path: str, mtime_ns: int) -> dict:
+    """Parse a YAML config once per file version; do not modify the result."""
+    with open(config_path, 'r', encoding='utf-8') as f:
+        return yaml.load(f, Loader=YAMLLoader)
+
 
 def load_translations(language: str) -> dict:
     """Load translation strings for the given language.
@@ -38,8 +91,7 @@ def load_translations(language: str) -> dict:
         Falls back to English for missing keys.
     """
     config_path = Path(__file__).parent.parent / "config" / "translations.yaml"
-    with open(config_path, 'r', encoding='utf-8') as f:
-        all_translations = yaml.safe_load(f)
+    all_translations = _load_yaml_file(str(config_path), config_path.stat().st_mtime_ns)
 
     en_strings = all_translations.get('en', {})
 
@@ -60,15 +112,27 @@ def make_t_function(translations: dict):
     Usage in templates: {{ t('key_name') }}
 
     Returns the translated string for the key, or the key itself if not found.
+    Formatted results are memoized per (key, kwargs), since templates repeat
+    the same calls across pages.
     """
-    def t(key: str, **kwargs) -> str:
+    @lru_cache(maxsize=1024)
+    def _format(key: str, items: tuple) -> str:
         value = translations.get(key, key)
-        if kwargs:
-            try:
-                value = value.format(**kwargs)
-            except (KeyError, IndexError):
-                pass
-        return value
+        try:
+            return value.format(**dict(items))
+        except (KeyError, IndexError):
+            return value
+
+    def t(key: str, **kwargs) -> str:
+        if not kwargs:
+            return translations.get(key, key)
+        items = tuple(sorted(kwargs.items()))
+        try:
+            hash(items)
+        except TypeError:
+            # Unhashable argument values can't be cached; format directly
+            return _format.__wrapped__(key, items)
+        return _format(key, items)
     return t
 
 
@@ -129,9 +193,8 @@ def generate_clean_report(csv_path, patient_info, output_path="clean_report.pdf"
     logger.info(f"Generated {len(charts)} charts")
 
     # Load configuration
-    config_path = Path("config/report_config.yaml")
-    with open(config_path, 'r') as f:
-        config = yaml.safe_load(f)
+    config_path = Path("config/report_config.yaml").resolve()
+    config = _load_yaml_file(str(config_path), config_path.stat().st_mtime_ns)
 
     # Load translations
     translations = load_translations(language)
@@ -141,16 +204,8 @@ def generate_clean_report(csv_path, patient_info, output_path="clean_report.pdf"
     css_path = Path("templates/clean/styles.css")
     css_content = css_path.read_text()
 
-    # Load page templates
-    template_dir = Path("templates/clean")
-    page1_content = (template_dir / "page1_sequencing.html").read_text()
-    page2_content = (template_dir / "page2_phylum.html").read_text()
-    page3_content = (template_dir / "page3_clinical.html").read_text()
-    page4_content = (template_dir / "page4_summary.html").read_text()
-    page5_content = (template_dir / "page5_species_list.html").read_text()
-
-    # Load master template
-    master_template = (template_dir / "report_clean.html").read_text()
+    # Load page templates (compiled once per process)
+    env = get_template_environment("templates/clean")
 
     # Prepare context
     context = {
@@ -165,13 +220,11 @@ def generate_clean_report(csv_path, patient_info, output_path="clean_report.pdf"
     }
 
     # Render each page
-    env = Environment()
-
-    page1_rendered = env.from_string(page1_content).render(**context)
-    page2_rendered = env.from_string(page2_content).render(**context)
-    page3_rendered = env.from_string(page3_content).render(**context)
-    page4_rendered = env.from_string(page4_content).render(**context)
-    page5_rendered = env.from_string(page5_content).render(**context)
+    page1_rendered = env.get_template("page1_sequencing.html").render(**context)
+    page2_rendered = env.get_template("page2_phylum.html").render(**context)
+    page3_rendered = env.get_template("page3_clinical.html").render(**context)
+    page4_rendered = env.get_template("page4_summary.html").render(**context)
+    page5_rendered = env.get_template("page5_species_list.html").render(**context)
 
     # Combine into master template
     final_context = {
@@ -185,7 +238,7 @@ def generate_clean_report(csv_path, patient_info, output_path="clean_report.pdf"
         'lang': language,
     }
 
-    final_html = env.from_string(master_template).render(**final_context)
+    final_html = env.get_template("report_clean.html").render(**final_context)
 
     # Save HTML for debugging
     html_path = Path(output_path).with_suffix('.html')
@@ -15,14 +15,14 @@ class CSVFormatValidator:
     """Validates microbiome CSV files against format specification"""
     
     # Required columns for different formats
-    REQUIRED_COLUMNS_FULL = {'species', 'phylum', 'genus', 'family', 'class', 'order'}
-    REQUIRED_COLUMNS_SIMPLE = {'species', 'phylum', 'genus'}
+    REQUIRED_COLUMNS_FULL = frozenset({'species', 'phylum', 'genus', 'family', 'class', 'order'})
+    REQUIRED_COLUMNS_SIMPLE = frozenset({'species', 'phylum', 'genus'})
     
     # Reference phyla that must match exactly
-    REFERENCE_PHYLA = {
+    REFERENCE_PHYLA = frozenset({
         'Actinomycetota', 'Bacillota', 'Bacteroidota', 
         'Pseudomonadota', 'Fibrobacterota'
-    }
+    })
     
     # Barcode column pattern
     BARCODE_PATTERN = re.compile(r'^barcode\d+$')
@@ -91,7 +91,7 @@ class CSVFormatValidator:
             self.info.append("Detected SIMPLE format with essential columns")
             format_type = "SIMPLE"
         else:
-            missing = self.REQUIRED_COLUMNS_SIMPLE - columns_lower
+            missing = set(self.REQUIRED_COLUMNS_SIMPLE) - columns_lower
             self.errors.append(f"Missing required columns: {missing}")
             return
             
@@ -211,31 +211,28 @@ class CSVFormatValidator:
             self.warnings.append("No barcode column has >= 10 species with non-zero counts")
     
     def _report_results(self):
-        """Report validation results"""
-        print("VALIDATION RESULTS")
-        print("-" * 60)
+        """Report validation results (collected, then written to stdout once)"""
+        out = ["VALIDATION RESULTS", "-" * 60]
         
         if self.errors:
-            print(f"\n❌ ERRORS ({len(self.errors)}):")
-            for error in self.errors:
-                print(f"   - {error}")
+            out.append(f"\n❌ ERRORS ({len(self.errors)}):")
+            out.extend(f"   - {error}" for error in self.errors)
         
         if self.warnings:
-            print(f"\n⚠️  WARNINGS ({len(self.warnings)}):")
-            for warning in self.warnings:
-                print(f"   - {warning}")
+            out.append(f"\n⚠️  WARNINGS ({len(self.warnings)}):")
+            out.extend(f"   - {warning}" for warning in self.warnings)
         
         if self.info:
-            print(f"\nℹ️  INFO ({len(self.info)}):")
-            for info in self.info:
-                print(f"   - {info}")
+            out.append(f"\nℹ️  INFO ({len(self.info)}):")
+            out.extend(f"   - {info}" for info in self.info)
         
-        print("\n" + "-" * 60)
+        out.append("\n" + "-" * 60)
         if self.errors:
-            print("❌ VALIDATION FAILED")
+            out.append("❌ VALIDATION FAILED")
         else:
-            print("✅ VALIDATION PASSED")
-        print("=" * 60 + "\n")
+            out.append("✅ VALIDATION PASSED")
+        out.append("=" * 60 + "\n")
+        sys.stdout.write("\n".join(out) + "\n")
     
     def test_with_csv_processor(self, barcode_column: str = None) -> bool:
         """Test if CSV works with CSVProcessor"""
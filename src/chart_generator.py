@@ -12,6 +12,12 @@ from typing import Dict, List, Tuple, Optional
 import logging
 import yaml
 
+# C-accelerated YAML parsing when libyaml is available
+try:
+    from yaml import CSafeLoader as YAMLLoader
+except ImportError:
+    from yaml import SafeLoader as YAMLLoader
+
 try:
     from .data_models import MicrobiomeData
 except ImportError:
@@ -39,7 +45,7 @@ def _load_chart_labels(language: str) -> dict:
     try:
         config_path = Path(__file__).parent.parent / "config" / "translations.yaml"
         with open(config_path, 'r', encoding='utf-8') as f:
-            all_translations = yaml.safe_load(f)
+            all_translations = yaml.load(f, Loader=YAMLLoader)
 
         en_strings = all_translations.get('en', {})
         lang_strings = all_translations.get(language, en_strings)
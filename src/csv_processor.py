@@ -3,10 +3,14 @@ CSV processing module for microbiome data
 Converts CSV files to MicrobiomeData objects
 """
 
+import csv
 import pandas as pd
 import numpy as np
 import re
 import yaml
+from collections import OrderedDict
+from dataclasses import replace
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, List, Tuple
 try:
@@ -14,6 +18,11 @@ try:
 except ImportError:
     from data_models import MicrobiomeData
 
+try:
+    from yaml import CSafeLoader as YAMLLoader
+except ImportError:
+    from yaml import SafeLoader as YAMLLoader
+
 
 class CSVProcessor:
     """Process microbiome CSV data into structured format"""
@@ -24,6 +33,22 @@ class CSVProcessor:
         'Micromonospora siamensis', 'Phocaeicola vulgatus'
     }
 
+    # Low-cardinality taxonomy columns held as pandas categoricals
+    CATEGORICAL_COLUMNS = {'superkingdom', 'domain', 'kingdom', 'phylum', 'class',
+                           'order', 'family', 'genus'}
+
+    # process() results keyed by (path, mtime_ns, barcode, exclusions), least
+    # recently used first; CSVProcessor.clear_cache() empties it
+    _processed: "OrderedDict[tuple, MicrobiomeData]" = OrderedDict()
+    PROCESS_CACHE_SIZE = 16
+
+    @classmethod
+    def clear_cache(cls):
+        """Drop memoized parses, configs and process() results"""
+        cls._processed.clear()
+        cls._parse_table.cache_clear()
+        cls._read_config.cache_clear()
+
     @staticmethod
     def get_all_barcode_columns(csv_path: str) -> List[str]:
         """
@@ -38,12 +63,70 @@ class CSVProcessor:
         Returns:
             List of barcode column names, or empty list if none found
         """
-        df = pd.read_csv(csv_path, nrows=1)  # Only read header row for efficiency
-        return [col for col in df.columns if col.startswith('barcode')]
+        # Only the header line is needed; csv.reader keeps quoted names intact
+        with open(csv_path, 'r', newline='', encoding='utf-8-sig') as f:
+            header = next(csv.reader(f), [])
+        return [col for col in header if col.startswith('barcode')]
+
+    @classmethod
+    def barcode_totals(cls, csv_path: str, config_path: str = None) -> Dict[str, int]:
+        """
+        Return the total read count for every barcode column in a CSV.
+
+        Totals match each barcode's CSVProcessor.total_count (eukaryotes
+        excluded) but come from one parse and one column-wise sum.
+
+        Args:
+            csv_path: Path to the CSV file
+            config_path: Optional config with the eukaryote exclusion list
+
+        Returns:
+            Mapping of barcode column to total count, in CSV column order
+        """
+        barcode_cols = cls.get_all_barcode_columns(csv_path)
+        if not barcode_cols:
+            return {}
+
+        processor = cls(csv_path, barcode_column=barcode_cols[0], config_path=config_path)
+        totals = processor.df[barcode_cols].to_numpy().sum(axis=0, dtype=np.int64)
+        return dict(zip(barcode_cols, totals.tolist()))
+
+    @staticmethod
+    def _read_table(csv_path: str, mtime_ns: int) -> pd.DataFrame:
+        """
+        Return the parsed CSV for (path, modification time).
+
+        Multi-barcode reports build one processor per barcode column on the
+        same file; they share a single parse. Each caller gets its own shallow
+        copy, so adding, dropping or replacing columns does not reach the
+        cached frame. Values are still shared: do not write cells in place.
+        """
+        return CSVProcessor._parse_table(csv_path, mtime_ns).copy(deep=False)
+
+    @staticmethod
+    @lru_cache(maxsize=8)
+    def _parse_table(csv_path: str, mtime_ns: int) -> pd.DataFrame:
+        """Parse a CSV once per (path, modification time); only _read_table may use this."""
+        df = pd.read_csv(csv_path)
+
+        # A handful of phyla/genera repeat across thousands of rows; store codes
+        for col in df.columns:
+            if col.lower() in CSVProcessor.CATEGORICAL_COLUMNS and df[col].dtype == object:
+                df[col] = df[col].astype('category')
+        return df
+
+    @staticmethod
+    @lru_cache(maxsize=8)
+    def _read_config(config_path: str, mtime_ns: int) -> dict:
+        """Parse a YAML config once per (path, modification time); do not modify the result."""
+        with open(config_path, 'r') as f:
+            return yaml.load(f, Loader=YAMLLoader) or {}
 
     def __init__(self, csv_path: str, barcode_column: str = None, config_path: str = None):
         self.csv_path = csv_path
-        self.df = pd.read_csv(csv_path)
+        resolved = Path(csv_path).resolve()
+        self._source_key = (str(resolved), resolved.stat().st_mtime_ns)
+        self.df = self._read_table(*self._source_key)
 
         # Load eukaryote exclusion list from config
         self._load_exclusion_list(config_path)
@@ -72,13 +155,13 @@ class CSVProcessor:
             config_path = Path(__file__).parent.parent / 'config' / 'report_config.yaml'
 
         try:
-            if Path(config_path).exists():
-                with open(config_path, 'r') as f:
-                    config = yaml.safe_load(f)
-                    if 'species_filtering' in config:
-                        self.EUKARYOTE_SPECIES.update(
-                            config['species_filtering'].get('exclude_eukaryotes', [])
-                        )
+            config_file = Path(config_path)
+            if config_file.exists():
+                config = self._read_config(str(config_file.resolve()), config_file.stat().st_mtime_ns)
+                if 'species_filtering' in config:
+                    self.EUKARYOTE_SPECIES.update(
+                        config['species_filtering'].get('exclude_eukaryotes', [])
+                    )
         except Exception as e:
             print(f"Warning: Could not load config file: {e}")
 
@@ -115,7 +198,40 @@ class CSVProcessor:
         return name.strip()
     
     def process(self) -> MicrobiomeData:
-        """Convert CSV to MicrobiomeData object"""
+        """
+        Convert CSV to MicrobiomeData object.
+
+        Results are memoized across processors per file version, barcode
+        column and exclusion list, so regenerating a report for the same
+        barcode skips the row walk. Only the PROCESS_CACHE_SIZE most recently
+        used results are kept. Each call returns its own copy.
+        """
+        key = self._source_key + (self.barcode_column, frozenset(self.EUKARYOTE_SPECIES))
+        data = self._processed.get(key)
+        if data is None:
+            data = self._build_microbiome_data()
+            self._processed[key] = data
+            while len(self._processed) > self.PROCESS_CACHE_SIZE:
+                self._processed.popitem(last=False)
+        else:
+            self._processed.move_to_end(key)
+        return self._copy_data(data)
+
+    @staticmethod
+    def _copy_data(data: MicrobiomeData) -> MicrobiomeData:
+        """Copy a cached result; its lists hold flat dicts, so one level is enough"""
+        return replace(
+            data,
+            species_list=[dict(s) for s in data.species_list],
+            phylum_distribution=dict(data.phylum_distribution),
+            parasite_results=[dict(r) for r in data.parasite_results],
+            microscopic_results=[dict(r) for r in data.microscopic_results],
+            biochemical_results=[dict(r) for r in data.biochemical_results],
+            recommendations=list(data.recommendations),
+        )
+
+    def _build_microbiome_data(self) -> MicrobiomeData:
+        """Compute MicrobiomeData from the filtered table"""
         species_list = self._get_species_list()
 
         # Calculate raw phylum distribution (includes all phyla)
@@ -19,11 +19,16 @@ Features:
 """
 
 import subprocess
+import gzip
+import csv
+import mmap
+import numpy as np
 import pandas as pd
 import os
 import logging
 from pathlib import Path
-from typing import List, Dict, Optional, Any, Union, NamedTuple
+from typing import List, Dict, Optional, Any, Union, NamedTuple, Tuple
+from collections import Counter, defaultdict
 import tempfile
 from dataclasses import dataclass
 from enum import Enum
@@ -123,8 +128,12 @@ class Kraken2Classifier:
     DEFAULT_THREADS = 4
     DEFAULT_CONFIDENCE = 0.1
     REQUIRED_DB_FILES = ['hash.k2d', 'opts.k2d', 'taxo.k2d']
+    TMPFS_DIR = '/dev/shm'
+    # Separator between barcode tag and original read ID in multiplexed runs
+    BARCODE_TAG_SEPARATOR = '__'
     
-    def __init__(self, db_path: str, threads: int = None, confidence_threshold: float = None):
+    def __init__(self, db_path: str, threads: int = None, confidence_threshold: float = None,
+                 memory_mapping: Optional[bool] = None):
         """
         Initialize Kraken2 classifier with validation.
         
@@ -132,6 +141,10 @@ class Kraken2Classifier:
             db_path: Path to Kraken2 database directory
             threads: Number of threads for classification (default: 4)
             confidence_threshold: Minimum confidence for classifications (default: 0.1)
+            memory_mapping: Pass --memory-mapping so Kraken2 maps the database
+                instead of loading it into its own heap. Defaults to True when
+                the database lives on tmpfs (/dev/shm), where the pages stay
+                resident between runs and per-sample DB loading disappears.
             
         Raises:
             ValueError: If configuration parameters are invalid
@@ -139,6 +152,12 @@ class Kraken2Classifier:
         self.db_path = Path(db_path).resolve()
         self.threads = threads or self.DEFAULT_THREADS
         self.confidence_threshold = confidence_threshold or self.DEFAULT_CONFIDENCE
+        if memory_mapping is None:
+            memory_mapping = self.db_path.is_relative_to(self.TMPFS_DIR)
+        self.memory_mapping = memory_mapping
+        
+        # species name -> (genus, phylum), filled once per name for this classifier
+        self._taxonomy_cache: Dict[str, Tuple[str, str]] = {}
         
         # Validate configuration
         self._validate_configuration()
@@ -156,6 +175,11 @@ class Kraken2Classifier:
         if not (0.0 <= self.confidence_threshold <= 1.0):
             raise ValueError("Confidence threshold must be between 0.0 and 1.0")
     
+    @staticmethod
+    def _probe_db(path: Union[str, Path]) -> bool:
+        """Check whether the database directory is reachable (may raise OSError)."""
+        return Path(path).exists()
+    
     def validate_database(self) -> bool:
         """
         Comprehensive database validation.
@@ -170,7 +194,7 @@ class Kraken2Classifier:
         """
         try:
             # Check directory exists
-            if not self.db_path.exists():
+            if not self._probe_db(self.db_path):
                 logger.debug(f"Database directory not found: {self.db_path}")
                 return False
             
@@ -198,6 +222,58 @@ class Kraken2Classifier:
             logger.error(f"Database validation error: {e}")
             return False
     
+    @classmethod
+    def preload_database(cls, db_path: Union[str, Path]) -> List[mmap.mmap]:
+        """
+        Fault the database files into the page cache ahead of the first run.
+        
+        Each *.k2d file is mapped read-only, with a hint to read it in up
+        front (MAP_POPULATE on Linux, MADV_WILLNEED elsewhere), so the first
+        sample usually avoids the cold-cache load. These are hints only: the
+        pages are not locked and the kernel may still evict them under memory
+        pressure. Close the returned maps when the database is no longer needed.
+        
+        Args:
+            db_path: Path to Kraken2 database directory
+            
+        Returns:
+            Open memory maps, one per non-empty database file
+        """
+        # flags/prot only exist on Unix; Windows maps with access= instead
+        if hasattr(mmap, 'MAP_SHARED'):
+            map_kwargs = {'flags': mmap.MAP_SHARED | getattr(mmap, 'MAP_POPULATE', 0),
+                          'prot': mmap.PROT_READ}
+        else:
+            map_kwargs = {'access': mmap.ACCESS_READ}
+        maps = []
+        
+        for db_file in sorted(Path(db_path).glob('*.k2d')):
+            try:
+                with open(db_file, 'rb') as f:
+                    mapped = mmap.mmap(f.fileno(), 0, **map_kwargs)
+            except (OSError, ValueError) as e:
+                # Empty files cannot be mapped; unreadable ones are reported later
+                logger.debug(f"Skipping preload of {db_file}: {e}")
+                continue
+            
+            if hasattr(mmap, 'MADV_WILLNEED'):
+                mapped.madvise(mmap.MADV_WILLNEED)
+            maps.append(mapped)
+        
+        logger.info(f"Preloaded {len(maps)} Kraken2 database files from {db_path}")
+        return maps
+    
+    def _scratch_dir(self) -> str:
+        """
+        Directory for intermediate Kraken2 output files.
+        
+        Prefers tmpfs (/dev/shm) so the per-read output and report never
+        touch the disk; falls back to the system temp directory elsewhere.
+        """
+        if os.path.isdir(self.TMPFS_DIR) and os.access(self.TMPFS_DIR, os.W_OK):
+            return self.TMPFS_DIR
+        return tempfile.gettempdir()
+    
     def _run_kraken2_classification(self, fastq_files: List[str], output_prefix: str) -> str:
         """
         Execute Kraken2 classification on FASTQ files with comprehensive error handling.
@@ -227,6 +303,9 @@ class Kraken2Classifier:
             '--report', f'{output_prefix}.kreport'
         ]
         
+        if self.memory_mapping:
+            cmd.append('--memory-mapping')
+        
         # Add input files
         cmd.extend(str(f) for f in fastq_files)
         
@@ -341,9 +420,7 @@ class Kraken2Classifier:
                         
                         # Only process species-level classifications (rank S)
                         if rank_code == 'S' and percentage > 0:
-                            # Extract genus and phylum info (simplified for testing)
-                            genus = self._extract_genus_from_name(name)
-                            phylum = self._map_species_to_phylum(name)
+                            genus, phylum = self._lookup_taxonomy(name)
                             
                             results.append({
                                 'species': name,
@@ -368,6 +445,20 @@ class Kraken2Classifier:
         
         return results
     
+    def _lookup_taxonomy(self, species_name: str) -> Tuple[str, str]:
+        """
+        Resolve (genus, phylum) for a species name, memoized per classifier.
+        
+        Report lines for the same species recur across samples, so each
+        name is only split and mapped once.
+        """
+        taxonomy = self._taxonomy_cache.get(species_name)
+        if taxonomy is None:
+            taxonomy = (self._extract_genus_from_name(species_name),
+                        self._map_species_to_phylum(species_name))
+            self._taxonomy_cache[species_name] = taxonomy
+        return taxonomy
+    
     def _extract_genus_from_name(self, species_name: str) -> str:
         """Extract genus from species name using TaxonomyMapper."""
         return TaxonomyMapper.extract_genus(species_name)
@@ -400,22 +491,15 @@ class Kraken2Classifier:
         Returns:
             DataFrame in project CSV format
         """
-        # Convert to DataFrame format matching existing pipeline
-        data = []
-        for result in kraken2_results:
-            data.append({
-                'species': result['species'],
-                barcode_column: result['abundance_reads'],  # Use read counts as abundance
-                'phylum': result['phylum'],
-                'genus': result['genus']
-            })
-        
-        # Create DataFrame with expected column order
-        df = pd.DataFrame(data)
-        
-        # Ensure correct column order
         columns = ['species', barcode_column, 'phylum', 'genus']
-        return df[columns] if not df.empty else pd.DataFrame(columns=columns)
+        if not kraken2_results:
+            return pd.DataFrame(columns=columns)
+        
+        # Build the frame in one pass; read counts are used as abundance
+        df = pd.DataFrame.from_records(
+            kraken2_results, columns=['species', 'abundance_reads', 'phylum', 'genus']
+        )
+        return df.rename(columns={'abundance_reads': barcode_column})
     
     def _merge_sample_results(self, sample_dfs: List[pd.DataFrame]) -> pd.DataFrame:
         """
@@ -470,8 +554,9 @@ class Kraken2Classifier:
         # Comprehensive input validation
         self._validate_inputs(fastq_files, barcode_column)
         
-        # Create temporary output prefix
-        with tempfile.NamedTemporaryFile(delete=False, prefix='kraken2_') as tmp:
+        # Create temporary output prefix (on tmpfs when available)
+        with tempfile.NamedTemporaryFile(delete=False, prefix='kraken2_',
+                                         dir=self._scratch_dir()) as tmp:
             output_prefix = tmp.name
         
         try:
@@ -511,6 +596,174 @@ class Kraken2Classifier:
             # Clean up temporary files
             self._cleanup_temp_files(output_prefix)
     
+    def classify_barcodes_to_csv(self, barcode_fastqs: Dict[str, List[str]]) -> pd.DataFrame:
+        """
+        Classify several barcodes with a single Kraken2 invocation.
+        
+        Reads from every barcode are tagged (``@{barcode}__{read_id}``) into
+        one FASTQ so the database is loaded once for the whole batch, then
+        the per-read output is demultiplexed back into barcode columns.
+        Species counts and confidence filtering match classify_fastq_to_csv
+        run separately per barcode.
+        
+        Args:
+            barcode_fastqs: Mapping of barcode column (e.g. 'barcode23') to
+                the FASTQ files for that barcode
+            
+        Returns:
+            DataFrame with species, one column per barcode, phylum, genus
+            
+        Raises:
+            ValueError: If inputs are invalid
+            FileNotFoundError: If FASTQ files not found
+            RuntimeError: If classification fails
+        """
+        if not barcode_fastqs:
+            raise ValueError("No barcodes provided. At least one barcode is required.")
+        
+        barcodes = list(barcode_fastqs)
+        for barcode, fastq_files in barcode_fastqs.items():
+            self._validate_inputs(fastq_files, barcode)
+        
+        with tempfile.NamedTemporaryFile(delete=False, prefix='kraken2_multi_',
+                                         dir=self._scratch_dir()) as tmp:
+            output_prefix = tmp.name
+        combined_fastq = f"{output_prefix}.fastq"
+        
+        try:
+            logger.info(f"Starting multiplexed Kraken2 classification for {len(barcodes)} barcodes")
+            
+            self._write_tagged_fastq(barcode_fastqs, combined_fastq)
+            report_file = self._run_kraken2_classification([combined_fastq], output_prefix)
+            
+            species_by_taxid = self._parse_species_taxids(report_file)
+            counts, totals = self._demultiplex_kraken2_output(
+                f"{output_prefix}.kraken2", species_by_taxid
+            )
+            
+            result_df = self._build_multibarcode_frame(counts, totals, barcodes)
+            logger.info(f"Successfully classified {len(result_df)} species across {len(barcodes)} barcodes")
+            return result_df
+            
+        except Exception as e:
+            logger.error(f"Multiplexed classification failed: {e}")
+            raise RuntimeError(f"FASTQ classification failed: {str(e)}") from e
+            
+        finally:
+            self._cleanup_temp_files(output_prefix)
+            if os.path.exists(combined_fastq):
+                os.unlink(combined_fastq)
+    
+    def _write_tagged_fastq(self, barcode_fastqs: Dict[str, List[str]], output_path: str) -> None:
+        """Concatenate FASTQ files, prefixing each read ID with its barcode."""
+        with open(output_path, 'w') as out:
+            for barcode, fastq_files in barcode_fastqs.items():
+                tag = f"@{barcode}{self.BARCODE_TAG_SEPARATOR}"
+                for fastq_file in fastq_files:
+                    opener = gzip.open if str(fastq_file).endswith('.gz') else open
+                    with opener(fastq_file, 'rt') as f:
+                        for line_number, line in enumerate(f):
+                            # Header is the first line of each 4-line record
+                            if line_number % 4 == 0 and line.startswith('@'):
+                                line = tag + line[1:]
+                            out.write(line)
+    
+    def _parse_species_taxids(self, report_file: str) -> Dict[int, str]:
+        """
+        Map every species and sub-species taxid in a report to its species name.
+        
+        Reports list taxa depth-first, so S1/S2 strain lines belong to the
+        most recent S line; this mirrors the clade counts used for single
+        sample classification.
+        """
+        species_by_taxid = {}
+        current_species = None
+        
+        with open(report_file, 'r') as f:
+            for line in f:
+                fields = line.rstrip('\n').split('\t')
+                if len(fields) < 6:
+                    continue
+                rank_code = fields[3]
+                taxid = int(fields[4])
+                if rank_code == 'S':
+                    current_species = fields[5].strip()
+                    species_by_taxid[taxid] = current_species
+                elif rank_code.startswith('S') and current_species:
+                    species_by_taxid[taxid] = current_species
+                else:
+                    current_species = None
+        
+        return species_by_taxid
+    
+    def _demultiplex_kraken2_output(self, output_file: str,
+                                   species_by_taxid: Dict[int, str]
+                                   ) -> Tuple[Dict[str, Counter], Counter]:
+        """
+        Count species-level reads per barcode from Kraken2 per-read output.
+        
+        Returns:
+            Tuple of (species counts per barcode, total reads per barcode)
+        """
+        # Parse the read ID and taxid columns with the C reader, then count
+        # every (species, barcode) pair with one bincount over integer codes
+        try:
+            output = pd.read_csv(output_file, sep='\t', header=None, usecols=[1, 2],
+                                 names=['read_id', 'taxid'], dtype={'read_id': str, 'taxid': np.int64},
+                                 quoting=csv.QUOTE_NONE)
+        except pd.errors.EmptyDataError:
+            return defaultdict(Counter), Counter()
+        
+        separator = self.BARCODE_TAG_SEPARATOR
+        barcode_codes, barcode_names = pd.factorize(
+            np.array([read_id.partition(separator)[0] for read_id in output['read_id'].tolist()],
+                     dtype=object)
+        )
+        species_names = sorted(set(species_by_taxid.values()))
+        species_index = {name: i for i, name in enumerate(species_names)}
+        taxid_codes = {taxid: species_index[name] for taxid, name in species_by_taxid.items()}
+        species_codes = output['taxid'].map(taxid_codes).fillna(-1).to_numpy(dtype=np.int64)
+        
+        n_barcodes = len(barcode_names)
+        totals = Counter(dict(zip(barcode_names, np.bincount(barcode_codes, minlength=n_barcodes).tolist())))
+        
+        classified = species_codes >= 0
+        matrix = np.bincount(
+            species_codes[classified] * n_barcodes + barcode_codes[classified],
+            minlength=len(species_names) * n_barcodes
+        ).reshape(len(species_names), n_barcodes)
+        
+        counts: Dict[str, Counter] = defaultdict(Counter)
+        for species_i, barcode_i in zip(*np.nonzero(matrix)):
+            counts[barcode_names[barcode_i]][species_names[species_i]] = int(matrix[species_i, barcode_i])
+        
+        return counts, totals
+    
+    def _build_multibarcode_frame(self, counts: Dict[str, Counter], totals: Counter,
+                                  barcodes: List[str]) -> pd.DataFrame:
+        """Assemble demultiplexed counts into the project CSV layout."""
+        columns = ['species'] + barcodes + ['phylum', 'genus']
+        
+        # Apply the same per-sample confidence filter as classify_fastq_to_csv
+        table: Dict[str, Dict[str, int]] = defaultdict(dict)
+        for barcode in barcodes:
+            total = totals.get(barcode, 0)
+            for species, reads in counts.get(barcode, {}).items():
+                if total and reads / total >= self.confidence_threshold:
+                    table[species][barcode] = reads
+        
+        if not table:
+            return pd.DataFrame(columns=columns)
+        
+        rows = []
+        for species, barcode_counts in table.items():
+            genus, phylum = self._lookup_taxonomy(species)
+            row = {'species': species, 'phylum': phylum, 'genus': genus}
+            row.update({barcode: barcode_counts.get(barcode, 0) for barcode in barcodes})
+            rows.append(row)
+        
+        return pd.DataFrame(rows, columns=columns)
+    
     def _validate_inputs(self, fastq_files: List[str], barcode_column: str) -> None:
         """
         Comprehensive input validation.
@@ -573,8 +826,8 @@ class Kraken2Classifier:
             logger.warning(f"Barcode column '{barcode_column}' doesn't follow 'barcode##' convention")
     
     def _cleanup_temp_files(self, output_prefix: str) -> None:
-        """Clean up temporary files with error handling."""
-        for suffix in ['.kraken2', '.kreport']:
+        """Clean up temporary files (including the prefix placeholder) with error handling."""
+        for suffix in ['', '.kraken2', '.kreport']:
             temp_file = f"{output_prefix}{suffix}"
             try:
                 if os.path.exists(temp_file):
@@ -681,7 +934,7 @@ class Kraken2FallbackManager:
                 )
                 
                 # Validate result quality
-                if self._is_classification_acceptable(result):
+                if self.is_classification_acceptable(result):
                     logger.info("✅ Kraken2 classification successful")
                     return result
                 else:
@@ -722,7 +975,42 @@ class Kraken2FallbackManager:
             
             raise RuntimeError(f"All classification methods failed. Details: {'; '.join(error_details)}")
     
-    def _is_classification_acceptable(self, result_df: pd.DataFrame) -> bool:
+    def classify_samples(self, sample_fastqs: Dict[str, List[str]]) -> Dict[str, Optional[pd.DataFrame]]:
+        """
+        Classify several samples with a single Kraken2 run.
+        
+        Args:
+            sample_fastqs: Mapping of sample column name to its FASTQ files
+            
+        Returns:
+            Per-sample tables (species, <sample>, phylum, genus). A sample
+            mapped to None was classified but failed the quality check and
+            should use the fallback pipeline; an empty dict means Kraken2 is
+            disabled or the run failed. Every Kraken2 result that is not used
+            counts towards fallback_attempts.
+        """
+        if not (self.use_kraken2 and self.kraken2_classifier):
+            return {}
+        
+        try:
+            table = self.kraken2_classifier.classify_barcodes_to_csv(sample_fastqs)
+        except Exception as e:
+            logger.warning(f"Batched Kraken2 classification failed: {e}")
+            self.fallback_attempts += 1
+            return {}
+        
+        classified = {}
+        for sample in sample_fastqs:
+            sample_df = table.loc[table[sample] > 0, ['species', sample, 'phylum', 'genus']]
+            if self.is_classification_acceptable(sample_df):
+                classified[sample] = sample_df.reset_index(drop=True)
+            else:
+                logger.warning(f"Kraken2 results quality too low for {sample}, using fallback")
+                self.fallback_attempts += 1
+                classified[sample] = None
+        return classified
+    
+    def is_classification_acceptable(self, result_df: pd.DataFrame) -> bool:
         """
         Check if classification results meet quality thresholds.
         
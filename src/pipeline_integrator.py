@@ -8,10 +8,15 @@ Provides complete workflow from FASTQ files to final PDF reports with Kraken2 cl
 
 import pandas as pd
 import os
+import re
 import time
 import logging
+import shutil
+import tempfile
+from contextlib import contextmanager
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Optional, Any, Tuple
+from typing import Dict, List, Optional, Any, NamedTuple, Tuple, Union, BinaryIO
 from .fastq_qc import FASTQQualityControl
 from .fastq_converter import FASTQtoCSVConverter
 from .report_generator import ReportGenerator
@@ -26,6 +31,86 @@ except ImportError:
     logger = logging.getLogger(__name__)
     logger.info("Kraken2 classifier not available, using existing pipeline only")
 
+# Environment variables read by MicrobiomePipelineIntegrator.from_environment
+KRAKEN2_ENV_VARS = ('KRAKEN2_DB_PATH', 'USE_KRAKEN2', 'KRAKEN2_THREADS', 'KRAKEN2_CONFIDENCE')
+
+
+class Kraken2EnvConfig(NamedTuple):
+    """Kraken2 settings parsed from the environment (immutable, safe to cache)."""
+    kraken2_db_path: Optional[str]
+    use_kraken2: bool
+    kraken2_threads: int
+    kraken2_confidence: float
+
+
+@lru_cache(maxsize=16)
+def _parse_kraken2_env(db_path: Optional[str], use_kraken2: Optional[str],
+                       threads: Optional[str], confidence: Optional[str]) -> Kraken2EnvConfig:
+    """Parse raw Kraken2 environment values; cached per distinct value set."""
+    try:
+        kraken2_threads = int(threads or '4')
+    except ValueError:
+        kraken2_threads = 4
+    
+    try:
+        kraken2_confidence = float(confidence or '0.1')
+    except ValueError:
+        kraken2_confidence = 0.1
+    
+    return Kraken2EnvConfig(
+        kraken2_db_path=db_path,
+        use_kraken2=(use_kraken2 or 'false').lower() == 'true',
+        kraken2_threads=kraken2_threads,
+        kraken2_confidence=kraken2_confidence,
+    )
+
+
+_CSV_SPECIAL_CHARS = re.compile(r'[",\r\n]')
+
+
+def _csv_field(value: str) -> str:
+    """Quote a text field the way DataFrame.to_csv does (QUOTE_MINIMAL)."""
+    if _CSV_SPECIAL_CHARS.search(value):
+        return '"' + value.replace('"', '""') + '"'
+    return value
+
+
+def write_abundance_csv(df: pd.DataFrame, csv_path, chunk_rows: int = 4096) -> None:
+    """
+    Write an abundance table, bypassing DataFrame.to_csv for the usual schema.
+    
+    Abundance tables are text columns (species, phylum, genus, ...) plus
+    integer barcode counts. For that shape each column is pulled out as a
+    plain list once and rows are rendered with a single format string,
+    roughly twice as fast as the generic per-cell writer. Output is
+    identical to df.to_csv(csv_path, index=False); any other shape
+    (floats, missing values, mixed objects) falls back to it.
+    """
+    columns = []
+    for name in (df.columns if df.columns.is_unique else []):
+        values = df[name]
+        if values.hasnans:
+            columns = []
+            break
+        if pd.api.types.is_integer_dtype(values):
+            columns.append(values.tolist())
+        elif pd.api.types.infer_dtype(values, skipna=False) == 'string':
+            columns.append([_csv_field(v) for v in values.tolist()])
+        else:
+            columns = []
+            break
+    
+    if not columns:
+        df.to_csv(csv_path, index=False)
+        return
+    
+    row_format = ','.join(['%s'] * len(columns)) + os.linesep
+    rows = list(zip(*columns))
+    with open(csv_path, 'w', newline='') as f:
+        f.write(','.join(_csv_field(str(name)) for name in df.columns) + os.linesep)
+        for start in range(0, len(rows), chunk_rows):
+            f.write(''.join([row_format % row for row in rows[start:start + chunk_rows]]))
+
 
 class MicrobiomePipelineIntegrator:
     """Integrate FASTQ processing with PDF report generation"""
@@ -36,11 +121,16 @@ class MicrobiomePipelineIntegrator:
                  kraken2_db_path: Optional[str] = None,
                  kraken2_threads: int = 4,
                  kraken2_confidence: float = 0.1,
-                 auto_detect_kraken2: bool = False):
+                 auto_detect_kraken2: bool = False,
+                 preload_kraken2_db: bool = False):
         """
         Initialize pipeline integrator with optional Kraken2 support.
         
         TDD GREEN Phase: Enhanced constructor for integration tests.
+        
+        With preload_kraken2_db, the database files are mapped with a
+        read-ahead hint when the integrator is created, so the first sample
+        usually avoids the cold-cache load.
         """
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(exist_ok=True)
@@ -59,6 +149,13 @@ class MicrobiomePipelineIntegrator:
         self.kraken2_confidence = kraken2_confidence
         self.use_kraken2 = use_kraken2 and KRAKEN2_AVAILABLE
         
+        # Fallback manager shared by every sample processed with this integrator
+        self._kraken2_manager = None
+        
+        # Per-sample tables from a shared Kraken2 run in batch_process
+        # (None marks a sample whose batched result failed the quality check)
+        self._batch_classified: Dict[str, Optional[pd.DataFrame]] = {}
+        
         # Auto-detection of Kraken2 availability
         if auto_detect_kraken2:
             self.kraken2_available = self._detect_kraken2_availability()
@@ -68,6 +165,21 @@ class MicrobiomePipelineIntegrator:
         # Validate Kraken2 configuration if enabled
         if self.use_kraken2:
             self._validate_kraken2_setup()
+        
+        # Memory maps of the database, read ahead into the page cache
+        self._preloaded_db = []
+        if preload_kraken2_db and self.use_kraken2:
+            self._preloaded_db = Kraken2Classifier.preload_database(self.kraken2_db_path)
+    
+    def close(self) -> None:
+        """Close the preloaded database maps."""
+        for mapped in self._preloaded_db:
+            mapped.close()
+        self._preloaded_db = []
+    
+    def __del__(self):
+        for mapped in getattr(self, '_preloaded_db', []):
+            mapped.close()
     
     def _detect_kraken2_availability(self) -> bool:
         """Detect if Kraken2 is available and properly configured."""
@@ -97,27 +209,37 @@ class MicrobiomePipelineIntegrator:
             return
     
     def process_sample(self, 
-                      fastq_file: str, 
+                      fastq_file: Union[str, bytes, BinaryIO], 
                       patient_info: Dict,
                       barcode_column: str = "barcode59",
                       run_qc: bool = True,
                       generate_pdf: bool = True,
-                      language: str = "en") -> Dict:
+                      language: str = "en",
+                      sample_name: Optional[str] = None) -> Dict:
         """
         Complete pipeline: FASTQ -> QC -> CSV -> PDF
         
         Args:
-            fastq_file: Path to FASTQ file
+            fastq_file: Path to FASTQ file, or the FASTQ content itself as
+                bytes or a binary file object
             patient_info: Dictionary with patient information
             barcode_column: Column name for this sample in CSV
             run_qc: Whether to run quality control
             generate_pdf: Whether to generate PDF report
             language: Language for PDF report (en, pl, jp)
+            sample_name: Name for output files (default: FASTQ file stem, or
+                barcode_column for in-memory input)
             
         Returns:
             Dictionary with paths to generated files
         """
-        sample_name = Path(fastq_file).stem
+        if not isinstance(fastq_file, (str, os.PathLike)):
+            with self._spill_fastq(fastq_file) as fastq_path:
+                return self.process_sample(fastq_path, patient_info, barcode_column, run_qc,
+                                           generate_pdf, language,
+                                           sample_name=sample_name or barcode_column)
+        
+        sample_name = sample_name or Path(fastq_file).stem
         results = {"sample_name": sample_name}
         
         # Step 1: Quality Control
@@ -142,7 +264,7 @@ class MicrobiomePipelineIntegrator:
         print(f"{'='*50}")
         
         # TDD GREEN: Add timing and integration tracking
-        start_time = time.time()
+        start_ns = time.monotonic_ns()
         
         # Determine which classifier to use
         use_kraken2_method = self.use_kraken2 and self._should_use_kraken2()
@@ -150,7 +272,7 @@ class MicrobiomePipelineIntegrator:
         if use_kraken2_method:
             print("Using Kraken2 for taxonomic classification...")
             try:
-                df = self._process_with_kraken2([fastq_file], barcode_column)
+                df = self._kraken2_sample_frame([fastq_file], sample_name, barcode_column)
                 results["classification_method"] = "kraken2"
                 results["kraken2_used"] = True
             except Exception as e:
@@ -166,14 +288,14 @@ class MicrobiomePipelineIntegrator:
             results["classification_method"] = "biopython"
             results["kraken2_used"] = False
         
-        # Record processing time
-        end_time = time.time()
-        results["processing_time_seconds"] = end_time - start_time
+        # Record processing time (monotonic, so clock adjustments can't skew it)
+        results["processing_time_seconds"] = (time.monotonic_ns() - start_ns) / 1e9
         
-        # Save CSV
+        # Save CSV; Python callers can also use the DataFrame directly
         csv_path = self.csv_dir / f"{sample_name}_abundance.csv"
-        df.to_csv(csv_path, index=False)
+        write_abundance_csv(df, csv_path)
         results["csv_path"] = csv_path
+        results["dataframe"] = df
         
         # Step 3: Generate PDF Report
         if generate_pdf:
@@ -225,10 +347,19 @@ class MicrobiomePipelineIntegrator:
                 - other patient info columns...
                 
         Returns:
-            List of result dictionaries for each sample
+            List of result dictionaries for each sample. Samples classified by
+            the shared Kraken2 run carry its duration in
+            'batch_classification_seconds'; their 'processing_time_seconds'
+            covers only their own share of the work.
         """
         results = []
         
+        # Classify every sample in one Kraken2 run before building reports
+        start_ns = time.monotonic_ns()
+        self._batch_classified = self._classify_manifest_with_kraken2(sample_manifest)
+        batch_seconds = (time.monotonic_ns() - start_ns) / 1e9
+        batched_paths = {path for path, df in self._batch_classified.items() if df is not None}
+        
         for idx, row in sample_manifest.iterrows():
             print(f"\n\n{'#'*60}")
             print(f"Processing sample {idx + 1}/{len(sample_manifest)}: {row['sample_name']}")
@@ -248,14 +379,115 @@ class MicrobiomePipelineIntegrator:
                 barcode_column=f"barcode{row.get('barcode_num', 59)}",
                 language=row.get('language', 'en')
             )
+            if str(row['fastq_path']) in batched_paths and result.get('kraken2_used'):
+                result['batch_classification_seconds'] = batch_seconds
             
             results.append(result)
         
+        self._batch_classified = {}
+        
         # Generate summary report
         self._generate_batch_summary(results)
         
         return results
     
+    def _classify_manifest_with_kraken2(self, sample_manifest: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+        """
+        Classify all manifest samples with a single Kraken2 invocation.
+        
+        Samples are tagged S0, S1, ... so arbitrary sample names never clash
+        with the read-tag separator. Returns per-sample results keyed by
+        FASTQ path, as from Kraken2FallbackManager.classify_samples: None
+        for a sample that failed the quality check. An empty dict (Kraken2
+        disabled or rejected by the manager, or the run failed) means every
+        sample is classified individually.
+        """
+        if sample_manifest.empty or not (self.use_kraken2 and self._should_use_kraken2()):
+            return {}
+        
+        fastq_paths = [str(path) for path in sample_manifest['fastq_path']]
+        tags = {f"S{i}": [path] for i, path in enumerate(fastq_paths)}
+        classified = self._get_kraken2_manager().classify_samples(tags)
+        if not classified:
+            return {}
+        return {path: classified.get(tag) for tag, path in zip(tags, fastq_paths)}
+    
+    def _kraken2_sample_frame(self, fastq_files: List[str], sample_name: str,
+                              barcode_column: str) -> pd.DataFrame:
+        """
+        Return a sample's batch Kraken2 table, or classify it on its own.
+        
+        Raises RuntimeError for a sample whose batched result failed the
+        quality check, so process_sample falls back without rerunning Kraken2.
+        """
+        if len(fastq_files) == 1 and str(fastq_files[0]) in self._batch_classified:
+            batched = self._batch_classified.pop(str(fastq_files[0]))
+            if batched is None:
+                raise RuntimeError("Kraken2 results quality too low in batch classification")
+            return batched.rename(columns={batched.columns[1]: barcode_column})
+        return self._process_with_kraken2(fastq_files, barcode_column)
+    
+    @staticmethod
+    @contextmanager
+    def _spill_fastq(fastq_data: Union[bytes, bytearray, memoryview, BinaryIO]):
+        """
+        Expose in-memory FASTQ content as a temporary file path.
+        
+        The classifiers and QC read from paths, so buffers are written once
+        to tmpfs (/dev/shm) when available, never to the output directory,
+        and removed once the sample has been classified.
+        """
+        scratch_dir = '/dev/shm' if os.access('/dev/shm', os.W_OK) else None
+        with tempfile.NamedTemporaryFile(suffix='.fastq', dir=scratch_dir, delete=False) as tmp:
+            if isinstance(fastq_data, (bytes, bytearray, memoryview)):
+                tmp.write(fastq_data)
+            else:
+                shutil.copyfileobj(fastq_data, tmp, length=1 << 20)
+        try:
+            yield tmp.name
+        finally:
+            os.unlink(tmp.name)
+    
+    def process_multibarcode(self, barcode_fastqs: Dict[str, List[str]]) -> pd.DataFrame:
+        """
+        Classify several barcodes into one multi-barcode abundance table.
+        
+        With Kraken2 enabled, all barcodes go through a single Kraken2 run so
+        the database is loaded once per batch instead of once per barcode.
+        Otherwise each barcode is classified with the existing pipeline and
+        the results are merged.
+        
+        Args:
+            barcode_fastqs: Mapping of barcode column (e.g. 'barcode23') to
+                that barcode's FASTQ files
+                
+        Returns:
+            DataFrame with species, one column per barcode, phylum, genus
+        """
+        if self.use_kraken2 and self._should_use_kraken2():
+            manager = self._get_kraken2_manager()
+            # The manager disables Kraken2 when its database fails validation
+            if manager.use_kraken2 and manager.kraken2_classifier is not None:
+                try:
+                    return manager.kraken2_classifier.classify_barcodes_to_csv(barcode_fastqs)
+                except Exception as e:
+                    print(f"Multiplexed Kraken2 processing failed: {e}")
+                    print("Falling back to existing pipeline...")
+        
+        merged = None
+        for barcode_column, fastq_files in barcode_fastqs.items():
+            df = self._classify_with_biopython(fastq_files, barcode_column, barcode_column)
+            df = df.groupby(['species', 'phylum', 'genus'], as_index=False)[barcode_column].sum()
+            merged = df if merged is None else merged.merge(
+                df, on=['species', 'phylum', 'genus'], how='outer'
+            )
+        
+        if merged is None:
+            return pd.DataFrame(columns=['species', 'phylum', 'genus'])
+        
+        columns = ['species'] + list(barcode_fastqs) + ['phylum', 'genus']
+        return merged.fillna(0)[columns]
+    
     def _generate_batch_summary(self, results: List[Dict]):
         """Generate summary report for batch processing"""
         summary_path = self.output_dir / "batch_summary.txt"
@@ -263,7 +495,12 @@ class MicrobiomePipelineIntegrator:
         with open(summary_path, "w") as f:
             f.write("Batch Processing Summary\n")
             f.write("=" * 50 + "\n\n")
-            f.write(f"Total samples processed: {len(results)}\n\n")
+            f.write(f"Total samples processed: {len(results)}\n")
+            batched = [r for r in results if 'batch_classification_seconds' in r]
+            if batched:
+                f.write(f"Shared Kraken2 classification: "
+                        f"{batched[0]['batch_classification_seconds']:.1f}s for {len(batched)} samples\n")
+            f.write("\n")
             
             for result in results:
                 f.write(f"Sample: {result['sample_name']}\n")
@@ -313,27 +550,9 @@ class MicrobiomePipelineIntegrator:
         
         TDD GREEN Phase: Environment-based configuration loading.
         """
-        # Load Kraken2 configuration from environment
-        kraken2_db_path = os.environ.get('KRAKEN2_DB_PATH')
-        use_kraken2 = os.environ.get('USE_KRAKEN2', 'false').lower() == 'true'
-        
-        # Parse numeric environment variables with defaults
-        try:
-            kraken2_threads = int(os.environ.get('KRAKEN2_THREADS', '4'))
-        except ValueError:
-            kraken2_threads = 4
-            
-        try:
-            kraken2_confidence = float(os.environ.get('KRAKEN2_CONFIDENCE', '0.1'))
-        except ValueError:
-            kraken2_confidence = 0.1
-        
-        return cls(
-            use_kraken2=use_kraken2,
-            kraken2_db_path=kraken2_db_path,
-            kraken2_threads=kraken2_threads,
-            kraken2_confidence=kraken2_confidence
-        )
+        # Parsing is memoized on the raw values, so changed variables are picked up
+        config = _parse_kraken2_env(*(os.environ.get(name) for name in KRAKEN2_ENV_VARS))
+        return cls(**config._asdict())
     
     def _process_with_kraken2(self, fastq_files: List[str], barcode_column: str) -> pd.DataFrame:
         """
@@ -344,17 +563,27 @@ class MicrobiomePipelineIntegrator:
         if not KRAKEN2_AVAILABLE:
             raise RuntimeError("Kraken2 not available")
         
-        # Create fallback manager
-        fallback_manager = Kraken2FallbackManager(
-            kraken2_db_path=self.kraken2_db_path or "/test/kraken2/db",  # Default for testing
-            fallback_processor_class=FASTQtoCSVConverter()
-        )
-        
         # Process with Kraken2 or fallback
-        result_df = fallback_manager.process_fastq(fastq_files, barcode_column)
+        result_df = self._get_kraken2_manager().process_fastq(fastq_files, barcode_column)
         
         return result_df
     
+    def _get_kraken2_manager(self) -> 'Kraken2FallbackManager':
+        """
+        Return the fallback manager, creating it on first use.
+        
+        The manager (and its classifier) is kept for the integrator's lifetime
+        so database validation happens once per batch rather than per sample.
+        Combined with a database on /dev/shm, which the classifier memory-maps,
+        repeated samples no longer pay the database load cost.
+        """
+        if self._kraken2_manager is None:
+            self._kraken2_manager = Kraken2FallbackManager(
+                kraken2_db_path=self.kraken2_db_path or "/test/kraken2/db",  # Default for testing
+                fallback_processor_class=FASTQtoCSVConverter()
+            )
+        return self._kraken2_manager
+    
     def _validate_csv_format_compatibility(self, df: pd.DataFrame) -> bool:
         """
         Validate that DataFrame matches expected CSV format.
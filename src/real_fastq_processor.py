@@ -4,12 +4,18 @@ Processes Oxford Nanopore FASTQ files to generate species abundance data
 """
 
 import os
+import io
 import gzip
+import queue
+import shutil
 import logging
+import threading
 import pandas as pd
 from pathlib import Path
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, Iterator, List, Tuple, Optional
 from collections import defaultdict, Counter
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
 import subprocess
 import tempfile
 import time
@@ -23,6 +29,13 @@ try:
 except ImportError:
     HAS_BIOPYTHON = False
 
+# C-backed FASTQ parser, used in place of the Python record loop when installed
+try:
+    import pyfastx
+    HAS_PYFASTX = True
+except ImportError:
+    HAS_PYFASTX = False
+
 logger = logging.getLogger(__name__)
 
 
@@ -50,6 +63,152 @@ class TaxonomicHit:
     length: int
 
 
+class ThreadedGzipReader(io.RawIOBase):
+    """
+    Binary stream over a gzip file decompressed ahead by a background thread.
+    
+    Decompression runs on its own thread into a small bounded queue of
+    chunks, so it overlaps with FASTQ parsing on the consumer thread
+    instead of stalling it on every readline.
+    """
+    
+    CHUNK_SIZE = 1 << 22  # 4 MB
+    QUEUE_DEPTH = 2
+    
+    def __init__(self, path):
+        super().__init__()
+        self._queue = queue.Queue(maxsize=self.QUEUE_DEPTH)
+        self._stop = threading.Event()
+        self._chunk = memoryview(b'')
+        self._eof = False
+        self._thread = threading.Thread(target=self._produce, args=(path,), daemon=True)
+        self._thread.start()
+    
+    def _produce(self, path):
+        try:
+            with gzip.open(path, 'rb') as f:
+                while not self._stop.is_set():
+                    chunk = f.read(self.CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    self._put(chunk)
+        except Exception as e:
+            self._put(e)
+        finally:
+            self._put(b'')  # EOF marker
+    
+    def _put(self, item):
+        # Poll so a closed reader never leaves the producer blocked forever
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+    
+    def readable(self):
+        return True
+    
+    def readinto(self, buffer):
+        if not self._chunk:
+            if self._eof:
+                return 0
+            item = self._queue.get()
+            if isinstance(item, Exception):
+                self._eof = True
+                raise item
+            if not item:
+                self._eof = True
+                return 0
+            self._chunk = memoryview(item)
+        
+        n = min(len(buffer), len(self._chunk))
+        buffer[:n] = self._chunk[:n]
+        self._chunk = self._chunk[n:]
+        return n
+    
+    def close(self):
+        self._stop.set()
+        self._thread.join()
+        super().close()
+
+
+def list_fastq_files(directory, suffixes: Tuple[str, ...] = ('.fastq.gz', '.fastq')) -> List[Path]:
+    """
+    List FASTQ files in a directory, grouped by suffix in the given order.
+    
+    Uses os.scandir with a plain suffix check instead of Path.glob: entry
+    types come from the directory listing itself, so run folders with
+    thousands of files are enumerated without fnmatch or per-file stat().
+    Symlinked files are still followed, as glob did.
+    """
+    with os.scandir(directory) as entries:
+        files = [entry for entry in entries if entry.name.endswith(suffixes) and entry.is_file()]
+    
+    return [Path(entry.path) for suffix in suffixes for entry in files if entry.name.endswith(suffix)]
+
+
+def prefetch_fastq_files(fastq_files: List[Path]) -> None:
+    """
+    Ask the kernel to start reading a batch of FASTQ files ahead of parsing.
+    
+    POSIX_FADV_WILLNEED queues asynchronous readahead for every file at
+    once, so on a cold cache the reads for later files are in flight while
+    earlier ones are being decompressed and classified. A no-op where
+    posix_fadvise is unavailable (macOS, Windows).
+    """
+    if not hasattr(os, 'posix_fadvise'):
+        return
+    
+    for fastq_file in fastq_files:
+        try:
+            fd = os.open(fastq_file, os.O_RDONLY)
+        except OSError:
+            continue  # Reported when the file is actually parsed
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+
+@contextmanager
+def open_fastq(fastq_file):
+    """
+    Open a FASTQ file for text reading, decompressing gzip off-thread.
+    
+    Gzipped files are piped through ``pigz -dc`` when it is installed and
+    otherwise read through ThreadedGzipReader; plain files are opened
+    directly.
+    """
+    if Path(fastq_file).suffix != '.gz':
+        with open(fastq_file, 'r') as f:
+            yield f
+        return
+    
+    pigz = shutil.which('pigz')
+    if pigz:
+        process = subprocess.Popen([pigz, '-dc', '-p', '2', str(fastq_file)],
+                                   stdout=subprocess.PIPE, bufsize=1 << 22)
+        try:
+            with io.TextIOWrapper(process.stdout) as f:
+                yield f
+        finally:
+            # Stop pigz if the caller finished before reaching end of file
+            if process.poll() is None:
+                process.kill()
+            process.wait()
+        if process.returncode not in (0, -9):
+            raise IOError(f"pigz failed to decompress {fastq_file}")
+        return
+    
+    with io.TextIOWrapper(io.BufferedReader(ThreadedGzipReader(fastq_file),
+                                            buffer_size=1 << 16)) as f:
+        yield f
+
+
 class MinimalTaxonomicClassifier:
     """
     Minimal taxonomic classifier using k-mer matching against reference database
@@ -141,45 +300,60 @@ class RealFASTQProcessor:
         self.classifier = MinimalTaxonomicClassifier()
         self.logger = logging.getLogger(__name__)
     
-    def process_barcode_directories(self, data_dir: str, barcode_dirs: List[str]) -> pd.DataFrame:
+    def process_barcode_directories(self, data_dir: str, barcode_dirs: List[str],
+                                    max_workers: Optional[int] = None) -> pd.DataFrame:
         """
         Process multiple barcode directories to generate abundance table
         
+        Barcode directories are independent until the final table is built,
+        so each one is processed in its own worker process.
+        
         Args:
             data_dir: Base directory containing barcode subdirectories
             barcode_dirs: List of barcode directory names (e.g., ['barcode04', 'barcode05'])
+            max_workers: Worker processes to use (default: one per directory, up to CPU count)
         
         Returns:
             DataFrame with species abundance data in reference CSV format
         """
         self.logger.info(f"Processing {len(barcode_dirs)} barcode directories")
         
-        # Process each barcode directory
-        barcode_results = {}
-        all_species = set()
-        
+        barcode_paths = {}
         for barcode_dir in barcode_dirs:
             barcode_path = Path(data_dir) / barcode_dir
             if not barcode_path.exists():
                 self.logger.warning(f"Barcode directory not found: {barcode_path}")
                 continue
-            
-            self.logger.info(f"Processing {barcode_dir}...")
-            classifications, stats = self.process_barcode_directory(str(barcode_path))
-            
-            # Count species abundances
-            species_counts = Counter()
-            for hit in classifications:
-                species_counts[hit.species] += 1
-                all_species.add(hit.species)
-            
+            barcode_paths[barcode_dir] = str(barcode_path)
+        
+        if max_workers is None:
+            max_workers = min(len(barcode_paths), os.cpu_count() or 1)
+        
+        if max_workers > 1:
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                futures = {
+                    barcode_dir: executor.submit(_count_barcode_species, self, barcode_path)
+                    for barcode_dir, barcode_path in barcode_paths.items()
+                }
+                counted = {barcode_dir: future.result() for barcode_dir, future in futures.items()}
+        else:
+            counted = {
+                barcode_dir: _count_barcode_species(self, barcode_path)
+                for barcode_dir, barcode_path in barcode_paths.items()
+            }
+        
+        barcode_results = {}
+        all_species = set()
+        
+        for barcode_dir, (species_counts, stats, total_classified) in counted.items():
+            all_species.update(species_counts)
             barcode_results[barcode_dir] = {
                 'counts': species_counts,
                 'stats': stats,
-                'total_classified': len(classifications)
+                'total_classified': total_classified
             }
             
-            self.logger.info(f"  {barcode_dir}: {stats.total_reads} reads, {len(classifications)} classified, {len(species_counts)} species")
+            self.logger.info(f"  {barcode_dir}: {stats.total_reads} reads, {total_classified} classified, {len(species_counts)} species")
         
         # Generate abundance table
         return self._create_abundance_dataframe(barcode_results, all_species)
@@ -192,13 +366,14 @@ class RealFASTQProcessor:
             Tuple of (classifications, statistics)
         """
         barcode_path = Path(barcode_path)
-        fastq_files = list(barcode_path.glob('*.fastq.gz')) + list(barcode_path.glob('*.fastq'))
+        fastq_files = list_fastq_files(barcode_path)
         
         if not fastq_files:
             self.logger.warning(f"No FASTQ files found in {barcode_path}")
             return [], SequenceStats()
         
         self.logger.info(f"Found {len(fastq_files)} FASTQ files in {barcode_path}")
+        prefetch_fastq_files(fastq_files)
         
         all_classifications = []
         stats = SequenceStats()
@@ -244,54 +419,90 @@ class RealFASTQProcessor:
     
     def _process_single_fastq(self, fastq_file: Path) -> Tuple[List[TaxonomicHit], SequenceStats]:
         """Process a single FASTQ file"""
-        classifications = []
         stats = SequenceStats()
-        
-        # Determine if file is gzipped
-        if fastq_file.suffix == '.gz':
-            opener = gzip.open
-            mode = 'rt'
-        else:
-            opener = open
-            mode = 'r'
-        
+        classifications = list(self._iter_classifications(fastq_file, stats))
+        return classifications, stats
+    
+    def _iter_classifications(self, fastq_file: Path, stats: SequenceStats) -> Iterator[TaxonomicHit]:
+        """Yield classified reads from a FASTQ file, updating stats as reads are seen"""
         try:
-            with opener(fastq_file, mode) as f:
-                # Parse FASTQ format (4 lines per read)
-                while True:
-                    # Read 4 lines for one sequence record
-                    header = f.readline().strip()
-                    if not header:
-                        break  # End of file
-                    
-                    sequence = f.readline().strip()
-                    plus_line = f.readline().strip()
-                    quality = f.readline().strip()
-                    
-                    if not (header and sequence and plus_line and quality):
-                        break  # Incomplete record
-                    
-                    stats.total_reads += 1
-                    stats.total_bases += len(sequence)
-                    
-                    # Quality filtering
-                    if len(sequence) < self.min_read_length:
-                        stats.quality_filtered += 1
-                        continue
-                    
-                    # Extract read ID
-                    read_id = header[1:].split()[0] if header.startswith('@') else header
-                    
-                    # Classify sequence
-                    hit = self.classifier.classify_sequence(sequence, read_id)
-                    if hit:
-                        classifications.append(hit)
-                        stats.classified_reads += 1
+            for read_id, sequence in self._iter_reads(fastq_file):
+                stats.total_reads += 1
+                stats.total_bases += len(sequence)
+                
+                # Quality filtering
+                if len(sequence) < self.min_read_length:
+                    stats.quality_filtered += 1
+                    continue
+                
+                # Classify sequence
+                hit = self.classifier.classify_sequence(sequence, read_id)
+                if hit:
+                    stats.classified_reads += 1
+                    yield hit
         
         except Exception as e:
             self.logger.error(f"Error reading FASTQ file {fastq_file}: {e}")
+    
+    @staticmethod
+    def _iter_reads(fastq_file: Path) -> Iterator[Tuple[str, str]]:
+        """Yield (read_id, sequence) for each record, via pyfastx when available"""
+        if HAS_PYFASTX:
+            # Fastx streams records (gzip included) without building an index
+            for read_id, sequence, _quality in pyfastx.Fastx(str(fastq_file)):
+                yield read_id, sequence
+            return
+        
+        with open_fastq(fastq_file) as f:
+            # Parse FASTQ format (4 lines per read)
+            while True:
+                # Read 4 lines for one sequence record
+                header = f.readline().strip()
+                if not header:
+                    break  # End of file
+                
+                sequence = f.readline().strip()
+                plus_line = f.readline().strip()
+                quality = f.readline().strip()
+                
+                if not (header and sequence and plus_line and quality):
+                    break  # Incomplete record
+                
+                # Extract read ID
+                read_id = header[1:].split()[0] if header.startswith('@') else header
+                yield read_id, sequence
+    
+    def count_barcode_species(self, barcode_path: str) -> Tuple[Counter, SequenceStats]:
+        """
+        Count classified reads per species across a barcode directory.
         
-        return classifications, stats
+        Streams reads straight into a Counter, so memory scales with the
+        number of species rather than the number of reads, unlike
+        process_barcode_directory which returns every TaxonomicHit.
+        
+        Returns:
+            Tuple of (species counts, statistics)
+        """
+        barcode_path = Path(barcode_path)
+        fastq_files = list_fastq_files(barcode_path)
+        
+        species_counts = Counter()
+        stats = SequenceStats()
+        
+        if not fastq_files:
+            self.logger.warning(f"No FASTQ files found in {barcode_path}")
+            return species_counts, stats
+        
+        self.logger.info(f"Found {len(fastq_files)} FASTQ files in {barcode_path}")
+        prefetch_fastq_files(fastq_files)
+        
+        for fastq_file in fastq_files:
+            species_counts.update(hit.species for hit in self._iter_classifications(fastq_file, stats))
+        
+        if stats.total_reads > 0:
+            stats.mean_length = stats.total_bases / stats.total_reads
+        
+        return species_counts, stats
     
     def _create_abundance_dataframe(self, barcode_results: Dict, all_species: set) -> pd.DataFrame:
         """
@@ -378,6 +589,18 @@ class RealFASTQProcessor:
         }
 
 
+def _count_barcode_species(processor: RealFASTQProcessor,
+                           barcode_path: str) -> Tuple[Counter, SequenceStats, int]:
+    """
+    Count species for one barcode directory.
+    
+    Module-level so it can run in a worker process; only the counts travel
+    back to the parent.
+    """
+    species_counts, stats = processor.count_barcode_species(barcode_path)
+    return species_counts, stats, stats.classified_reads
+
+
 def process_fastq_directories_to_csv(data_dir: str, barcode_dirs: List[str], output_csv: str) -> bool:
     """
     Main function to process FASTQ directories and generate CSV abundance table
@@ -1,8 +1,47 @@
 import pytest
 import tempfile
+import yaml
+from functools import lru_cache
 from pathlib import Path
 from src.data_models import PatientInfo, MicrobiomeData
 from src.batch_processor import BatchConfig
+from tests.fixtures.report_data import create_sample_patient, create_sample_microbiome
+
+try:
+    from yaml import CSafeLoader as YAMLLoader
+except ImportError:
+    from yaml import SafeLoader as YAMLLoader
+
+TRANSLATIONS_PATH = Path(__file__).parent.parent / "config" / "translations.yaml"
+
+
+@lru_cache(maxsize=1)
+def load_raw_translations() -> dict:
+    """Parse config/translations.yaml once per session; treat as read-only"""
+    with open(TRANSLATIONS_PATH, "r", encoding="utf-8") as f:
+        return yaml.load(f, Loader=YAMLLoader)
+
+
+def pytest_addoption(parser):
+    parser.addoption("--runslow", action="store_true", default=False,
+                     help="run tests marked slow (skipped by default)")
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "slow: long-running integration/concurrency test; run with --runslow or -m slow")
+    # Provided by pytest-xdist; registered here so runs without it stay warning-free
+    config.addinivalue_line("markers", "xdist_group(name): run grouped tests on one xdist worker (--dist loadgroup)")
+
+
+def pytest_collection_modifyitems(config, items):
+    """Skip slow tests unless --runslow is given or the -m expression mentions slow"""
+    if config.getoption("--runslow") or "slow" in config.getoption("markexpr"):
+        return
+    skip_slow = pytest.mark.skip(reason="slow test; use --runslow or -m slow to run")
+    for item in items:
+        if "slow" in item.keywords:
+            item.add_marker(skip_slow)
+
 
 @pytest.fixture
 def temp_dir():
@@ -22,6 +61,26 @@ def sample_patient():
         requested_by="Dr. Test Vet"
     )
 
+@pytest.fixture(scope="session")
+def report_patient():
+    """Provide the report-test patient, built once; treat as read-only"""
+    return create_sample_patient()
+
+@pytest.fixture(scope="session")
+def sample_microbiome_normal():
+    """Provide normal microbiome data, built once; treat as read-only"""
+    return create_sample_microbiome("normal")
+
+@pytest.fixture(scope="session")
+def raw_yaml():
+    """Provide the parsed translations.yaml shared with load_raw_translations()"""
+    return load_raw_translations()
+
+@pytest.fixture(scope="session")
+def en_keys(raw_yaml):
+    """Provide the set of English translation keys"""
+    return set(raw_yaml.get("en", {}).keys())
+
 @pytest.fixture
 def sample_csv_data():
     """Provide sample CSV data structure"""
@@ -124,4 +183,26 @@ def dysbiotic_csv_data():
         {"species": "Enterococcus faecalis", "phylum": "Bacillota", "genus": "Enterococcus", "abundance": 180},
         {"species": "Bacteroides fragilis", "phylum": "Bacteroidota", "genus": "Bacteroides", "abundance": 120},
         {"species": "Lactobacillus acidophilus", "phylum": "Bacillota", "genus": "Lactobacillus", "abundance": 50}
-    ]
\ No newline at end of file
+    ]
+
+@pytest.fixture(scope="session")
+def kraken_fs(tmp_path_factory):
+    """Provide a shared on-disk layout for Kraken2 error-handling tests.
+
+    Built once per session: empty/malformed/valid FASTQ files and a
+    database directory whose .k2d files are empty.
+    """
+    root = tmp_path_factory.mktemp("k2err")
+
+    (root / "empty.fastq").touch()
+    (root / "malformed.fastq").write_text(
+        "This is not a valid FASTQ file\nMissing proper headers\n"
+    )
+    (root / "valid.fastq").write_text("@seq1\nATCG\n+\nIIII\n")
+
+    corrupt_db = root / "corrupt_db"
+    corrupt_db.mkdir()
+    for filename in ["hash.k2d", "opts.k2d", "taxo.k2d"]:
+        (corrupt_db / filename).touch()
+
+    return root
@@ -34,7 +34,13 @@ def create_sample_patient(name: str = "Montana", sample_number: str = "506") ->
 
 
 def create_sample_microbiome(data_type: str = "normal") -> MicrobiomeData:
-    """Create sample microbiome data for testing"""
+    """Return sample microbiome data for testing.
+
+    The data objects are the module-level constants from
+    tests.fixtures.microbiome_data, built once at import and shared by every
+    caller, so repeated calls cost a lookup. Treat them as read-only; copy
+    before modifying.
+    """
     if data_type == "normal":
         return MICROBIOME_NORMAL
     elif data_type == "mild":
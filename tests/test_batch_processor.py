@@ -22,7 +22,6 @@ from tests.utils.batch_test_helpers import (
     create_large_batch_files,
     assert_processing_result,
     assert_batch_results,
-    cleanup_temp_directories,
     create_test_patient_info,
     MockProgressCallback,
     count_species_in_csv
@@ -97,11 +96,10 @@ class TestBatchProcessor:
     """Test BatchProcessor class functionality"""
     
     @pytest.fixture
-    def batch_config(self):
+    def batch_config(self, tmp_path):
         """Create test batch configuration"""
-        config = create_temp_batch_config()
-        yield config
-        cleanup_temp_directories(config.reports_dir.parent)
+        config = create_temp_batch_config(tmp_path)
+        return config
     
     @pytest.fixture
     def processor(self, batch_config):
@@ -206,11 +204,10 @@ class TestCoreBatchProcessing:
     """Test core batch processing functionality"""
     
     @pytest.fixture
-    def batch_config(self):
+    def batch_config(self, tmp_path):
         """Create test batch configuration"""
-        config = create_temp_batch_config()
-        yield config
-        cleanup_temp_directories(config.reports_dir.parent)
+        config = create_temp_batch_config(tmp_path)
+        return config
     
     @pytest.fixture
     def processor(self, batch_config):
@@ -339,15 +336,15 @@ class TestValidationAndQualityControl:
     """Test validation and quality control functionality"""
     
     @pytest.fixture
-    def batch_config(self):
+    def batch_config(self, tmp_path):
         """Create test batch configuration with custom validation"""
         config = create_temp_batch_config(
+            tmp_path,
             min_species_count=8,
             max_unassigned_percentage=40.0,
             required_phyla=["Bacillota", "Bacteroidota"]
         )
-        yield config
-        cleanup_temp_directories(config.reports_dir.parent)
+        return config
     
     @pytest.fixture
     def processor(self, batch_config):
@@ -413,14 +410,14 @@ class TestParallelProcessing:
     """Test parallel processing functionality"""
     
     @pytest.fixture
-    def batch_config(self):
+    def batch_config(self, tmp_path):
         """Create test batch configuration for parallel processing"""
         config = create_temp_batch_config(
+            tmp_path,
             parallel_processing=True,
             max_workers=2
         )
-        yield config
-        cleanup_temp_directories(config.reports_dir.parent)
+        return config
     
     @pytest.fixture  
     def processor(self, batch_config):
@@ -521,13 +518,12 @@ class TestManifestProcessing:
     """Test manifest-based processing functionality"""
     
     @pytest.fixture
-    def batch_config(self):
+    def batch_config(self, tmp_path):
         """Create test batch configuration"""
-        config = create_temp_batch_config()
+        config = create_temp_batch_config(tmp_path)
         # Point to the batch data directory for manifest files
         config.data_dir = Path('tests/fixtures/batch_data/valid_batch')
-        yield config
-        cleanup_temp_directories(config.reports_dir.parent)
+        return config
     
     @pytest.fixture
     def processor(self, batch_config):
@@ -609,14 +605,14 @@ class TestPerformanceAndScaling:
     """Test performance and scaling functionality"""
     
     @pytest.fixture
-    def batch_config(self):
+    def batch_config(self, tmp_path):
         """Create test batch configuration for performance testing"""
         config = create_temp_batch_config(
+            tmp_path,
             parallel_processing=True,
             max_workers=2
         )
-        yield config
-        cleanup_temp_directories(config.reports_dir.parent)
+        return config
     
     @pytest.fixture
     def processor(self, batch_config):
@@ -678,55 +674,48 @@ class TestPerformanceAndScaling:
             assert memory_increase < 100 * 1024 * 1024  # 100MB threshold
             assert len(results) == 8
     
-    def test_concurrent_batch_safety(self, processor):
+    def test_concurrent_batch_safety(self, processor, tmp_path):
         """Test multiple batch processors can run safely"""
         def run_batch_process(proc, directory):
             """Helper function to run batch processing"""
             proc.config.data_dir = directory
             return proc.process_directory(validate=False)
         
-        # Create multiple temp directories with data
+        # Create multiple data directories under tmp_path
         temp_dirs = []
-        try:
-            for i in range(3):
-                temp_dir = tempfile.mkdtemp()
-                temp_path = Path(temp_dir)
-                create_large_batch_files(temp_path, count=3)
-                temp_dirs.append(temp_path)
-            
-            # Create multiple processors
-            processors = [
-                BatchProcessor(create_temp_batch_config()) 
-                for _ in range(3)
+        for i in range(3):
+            temp_path = tmp_path / f"data_{i}"
+            create_large_batch_files(temp_path, count=3)
+            temp_dirs.append(temp_path)
+        
+        # Create multiple processors, each with its own reports directory
+        processors = [
+            BatchProcessor(create_temp_batch_config(tmp_path / f"run_{i}"))
+            for i in range(3)
+        ]
+        
+        # Run concurrent processing
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            futures = [
+                executor.submit(run_batch_process, proc, directory)
+                for proc, directory in zip(processors, temp_dirs)
             ]
             
-            # Run concurrent processing
-            with ThreadPoolExecutor(max_workers=3) as executor:
-                futures = [
-                    executor.submit(run_batch_process, proc, directory)
-                    for proc, directory in zip(processors, temp_dirs)
-                ]
-                
-                results_list = [future.result() for future in futures]
-            
-            # Verify all processes completed successfully
-            for results in results_list:
-                assert len(results) == 3
-                
-        finally:
-            # Cleanup temp directories
-            cleanup_temp_directories(*temp_dirs)
+            results_list = [future.result() for future in futures]
+        
+        # Verify all processes completed successfully
+        for results in results_list:
+            assert len(results) == 3
 
 
 class TestSummaryAndReporting:
     """Test summary generation and reporting functionality"""
     
     @pytest.fixture
-    def batch_config(self):
+    def batch_config(self, tmp_path):
         """Create test batch configuration"""
-        config = create_temp_batch_config()
-        yield config
-        cleanup_temp_directories(config.reports_dir.parent)
+        config = create_temp_batch_config(tmp_path)
+        return config
     
     @pytest.fixture
     def processor(self, batch_config):
@@ -828,11 +817,10 @@ class TestErrorHandlingAndRecovery:
     """Test error handling and recovery mechanisms"""
     
     @pytest.fixture
-    def batch_config(self):
+    def batch_config(self, tmp_path):
         """Create test batch configuration"""
-        config = create_temp_batch_config()
-        yield config
-        cleanup_temp_directories(config.reports_dir.parent)
+        config = create_temp_batch_config(tmp_path)
+        return config
     
     @pytest.fixture
     def processor(self, batch_config):
@@ -896,11 +884,10 @@ class TestIntegrationScenarios:
     """Integration tests for real-world scenarios"""
     
     @pytest.fixture
-    def batch_config(self):
+    def batch_config(self, tmp_path):
         """Create test batch configuration"""
-        config = create_temp_batch_config()
-        yield config
-        cleanup_temp_directories(config.reports_dir.parent)
+        config = create_temp_batch_config(tmp_path)
+        return config
     
     @pytest.fixture
     def processor(self, batch_config):
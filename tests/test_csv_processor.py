@@ -419,6 +419,113 @@ class TestCSVProcessor:
                 assert isinstance(species["percentage"], float)
                 assert species["percentage"] > 0
                 assert species["percentage"] <= 100
+    
+    def test_taxonomy_columns_are_categorical(self, tmp_path):
+        """Repeated taxonomy strings are held as categories; output is unchanged"""
+        csv_path = tmp_path / "categories.csv"
+        csv_path.write_text(
+            "species,barcode01,phylum,genus\n"
+            "A a,3,Bacillota,A\n"
+            "B b,1,Bacillota,B\n"
+            "C c,1,Bacteroidota,C\n"
+        )
+
+        processor = CSVProcessor(str(csv_path), barcode_column='barcode01')
+        data = processor.process()
+
+        assert isinstance(processor.df['phylum'].dtype, pd.CategoricalDtype)
+        assert processor.df['species'].dtype == object
+        assert data.species_list[0]['phylum'] == 'Bacillota'
+        assert data.phylum_distribution['Bacillota'] == 80.0
+
+
+class TestCSVProcessorCaching:
+    """Shared parses, config reads and process() results across processors"""
+
+    def test_barcode_totals_match_per_barcode_processors(self, tmp_path):
+        """barcode_totals agrees with total_count of per-barcode processors"""
+        csv_path = tmp_path / "totals.csv"
+        csv_path.write_text(
+            "species,barcode01,barcode02,phylum\n"
+            "A,1,2,Bacillota\n"
+            "Homo sapiens,50,50,Chordata\n"
+            "B,3,0,Bacteroidota\n"
+        )
+
+        totals = CSVProcessor.barcode_totals(str(csv_path))
+
+        assert totals == {'barcode01': 4, 'barcode02': 2}
+        for barcode, total in totals.items():
+            assert CSVProcessor(str(csv_path), barcode_column=barcode).total_count == total
+
+    def test_processors_share_parse_until_file_changes(self, tmp_path):
+        """Processors on the same file reuse one parse; edits are picked up"""
+        csv_path = tmp_path / "shared.csv"
+        csv_path.write_text("species,barcode01,barcode02,phylum\nA,1,2,Bacillota\n")
+
+        first = CSVProcessor(str(csv_path), barcode_column='barcode01')
+        hits = CSVProcessor._parse_table.cache_info().hits
+        first.df['percentage'] = 0.0
+        second = CSVProcessor(str(csv_path), barcode_column='barcode02')
+        assert CSVProcessor._parse_table.cache_info().hits == hits + 1
+        assert 'percentage' not in second.df.columns
+        assert first.total_count == 1
+        assert second.total_count == 2
+
+        csv_path.write_text("species,barcode01,barcode02,phylum\nA,5,6,Bacillota\n")
+        os.utime(csv_path, ns=(0, csv_path.stat().st_mtime_ns + 1))
+
+        assert CSVProcessor(str(csv_path), barcode_column='barcode01').total_count == 5
+
+    def test_config_parsed_once_until_file_changes(self, tmp_path):
+        """Exclusion config is parsed once per file version"""
+        csv_path = tmp_path / "config.csv"
+        csv_path.write_text("species,barcode01,phylum\nA a,1,Bacillota\nB b,2,Bacillota\n")
+        config_path = tmp_path / "report_config.yaml"
+        config_path.write_text("species_filtering:\n  exclude_eukaryotes: []\n")
+
+        CSVProcessor(str(csv_path), config_path=str(config_path))
+        misses = CSVProcessor._read_config.cache_info().misses
+        CSVProcessor(str(csv_path), config_path=str(config_path))
+        assert CSVProcessor._read_config.cache_info().misses == misses
+
+        config_path.write_text("species_filtering:\n  exclude_eukaryotes: ['B b']\n")
+        os.utime(config_path, ns=(0, config_path.stat().st_mtime_ns + 1))
+        processor = CSVProcessor(str(csv_path), config_path=str(config_path))
+        assert 'B b' in processor.EUKARYOTE_SPECIES
+        processor.EUKARYOTE_SPECIES.discard('B b')
+
+    def test_process_is_reused_across_processors(self, tmp_path):
+        """A new processor on the same file and barcode reuses the result but gets a copy"""
+        csv_path = tmp_path / "memo.csv"
+        csv_path.write_text("species,barcode01,barcode02,phylum\nA,1,2,Bacillota\nB,3,0,Bacteroidota\n")
+
+        first = CSVProcessor(str(csv_path), barcode_column='barcode01').process()
+        first.species_list[0]['species'] = 'edited'
+        first.species_list.append({})
+        processor = CSVProcessor(str(csv_path), barcode_column='barcode01')
+        with patch.object(processor, '_build_microbiome_data') as build:
+            second = processor.process()
+
+        build.assert_not_called()
+        assert [s['species'] for s in second.species_list] == ['B', 'A']
+        other = CSVProcessor(str(csv_path), barcode_column='barcode02').process()
+        assert [s['species'] for s in other.species_list] == ['A']
+
+    def test_process_cache_keeps_most_recent_results(self, tmp_path, monkeypatch):
+        """The process() cache is bounded and evicts the least recently used result"""
+        monkeypatch.setattr(CSVProcessor, 'PROCESS_CACHE_SIZE', 1)
+        csv_path = tmp_path / "bounded.csv"
+        csv_path.write_text("species,barcode01,barcode02,phylum\nA,1,2,Bacillota\n")
+
+        CSVProcessor(str(csv_path), barcode_column='barcode01').process()
+        CSVProcessor(str(csv_path), barcode_column='barcode02').process()
+
+        assert [key[2] for key in CSVProcessor._processed] == ['barcode02']
+        CSVProcessor.clear_cache()
+        assert not CSVProcessor._processed
+
+
 # - Test data validation and error handling
 # - Test barcode column selection
 # - Test species data processing
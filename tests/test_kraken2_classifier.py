@@ -119,7 +119,117 @@ class TestKraken2Classifier:
         
         with pytest.raises(RuntimeError, match="Kraken2 classification failed"):
             classifier._run_kraken2_classification(["test.fastq"], "output")
-    
+
+    def test_scratch_dir_prefers_tmpfs(self):
+        """Intermediate Kraken2 output goes to /dev/shm when it is usable"""
+        from src.kraken2_classifier import Kraken2Classifier
+        classifier = Kraken2Classifier("/test/db")
+
+        with patch('os.path.isdir', return_value=True), \
+             patch('os.access', return_value=True):
+            assert classifier._scratch_dir() == Kraken2Classifier.TMPFS_DIR
+
+        with patch('os.path.isdir', return_value=False):
+            assert classifier._scratch_dir() == tempfile.gettempdir()
+
+    @patch('subprocess.run')
+    def test_tmpfs_database_is_memory_mapped(self, mock_subprocess):
+        """A database on /dev/shm is memory-mapped instead of loaded per run"""
+        mock_subprocess.return_value = MagicMock(returncode=0, stderr="")
+
+        from src.kraken2_classifier import Kraken2Classifier
+        tmpfs_classifier = Kraken2Classifier("/dev/shm/k2db")
+        disk_classifier = Kraken2Classifier("/test/db")
+
+        assert tmpfs_classifier.memory_mapping is True
+        assert disk_classifier.memory_mapping is False
+
+        with patch('src.kraken2_classifier.Path.exists', return_value=True):
+            tmpfs_classifier._run_kraken2_classification(["test.fastq"], "output_prefix")
+        assert "--memory-mapping" in mock_subprocess.call_args[0][0]
+
+    def test_taxonomy_lookup_is_memoized(self):
+        """Genus/phylum for a species name are resolved once per classifier"""
+        from src.kraken2_classifier import Kraken2Classifier
+        classifier = Kraken2Classifier("/test/db")
+
+        with patch.object(classifier, '_map_species_to_phylum',
+                          wraps=classifier._map_species_to_phylum) as mock_map:
+            first = classifier._lookup_taxonomy("Lactobacillus acidophilus")
+            second = classifier._lookup_taxonomy("Lactobacillus acidophilus")
+
+        assert first == second == ("Lactobacillus", "Bacillota")
+        mock_map.assert_called_once()
+
+    def test_preload_database_maps_database_files(self, tmp_path):
+        """Non-empty .k2d files are mapped read-only; empty ones are skipped"""
+        (tmp_path / "hash.k2d").write_bytes(b"\x01" * 4096)
+        (tmp_path / "taxo.k2d").write_bytes(b"\x02" * 128)
+        (tmp_path / "opts.k2d").write_bytes(b"")
+
+        from src.kraken2_classifier import Kraken2Classifier
+        maps = Kraken2Classifier.preload_database(tmp_path)
+
+        try:
+            assert [len(m) for m in maps] == [4096, 128]
+            assert maps[0][:1] == b"\x01"
+        finally:
+            for m in maps:
+                m.close()
+
+    def test_preload_database_without_unix_mmap_flags(self, tmp_path, monkeypatch):
+        """Platforms without MAP_SHARED (Windows) map with access= instead"""
+        import mmap
+        monkeypatch.delattr(mmap, 'MAP_SHARED')
+        (tmp_path / "hash.k2d").write_bytes(b"\x01" * 64)
+
+        from src.kraken2_classifier import Kraken2Classifier
+        maps = Kraken2Classifier.preload_database(tmp_path)
+
+        try:
+            assert [len(m) for m in maps] == [64]
+        finally:
+            for m in maps:
+                m.close()
+
+    def test_multiple_barcodes_classified_in_one_run(self, tmp_path):
+        """Barcodes share one Kraken2 run and are split back into columns"""
+        fastqs = {}
+        for barcode, reads in (("barcode01", 3), ("barcode02", 2)):
+            path = tmp_path / f"{barcode}.fastq"
+            path.write_text("".join(f"@r{i}\nACGT\n+\nIIII\n" for i in range(reads)))
+            fastqs[barcode] = [str(path)]
+
+        def fake_kraken2(fastq_files, output_prefix):
+            combined = Path(fastq_files[0]).read_text().splitlines()[::4]
+            assert combined[0] == "@barcode01__r0"
+            assert combined[-1] == "@barcode02__r1"
+            Path(f"{output_prefix}.kreport").write_text(
+                "100.00\t5\t0\tS\t562\t    Escherichia coli\n"
+                "40.00\t2\t2\tS1\t83333\t      Escherichia coli K-12\n"
+            )
+            Path(f"{output_prefix}.kraken2").write_text(
+                "C\tbarcode01__r0\t562\t4\t-\n"
+                "C\tbarcode01__r1\t83333\t4\t-\n"
+                "U\tbarcode01__r2\t0\t4\t-\n"
+                "C\tbarcode02__r0\t562\t4\t-\n"
+                "C\tbarcode02__r1\t562\t4\t-\n"
+            )
+            return f"{output_prefix}.kreport"
+
+        from src.kraken2_classifier import Kraken2Classifier
+        classifier = Kraken2Classifier("/test/db")
+
+        with patch.object(classifier, '_run_kraken2_classification',
+                          side_effect=fake_kraken2) as mock_run:
+            result_df = classifier.classify_barcodes_to_csv(fastqs)
+
+        mock_run.assert_called_once()
+        assert list(result_df.columns) == ["species", "barcode01", "barcode02", "phylum", "genus"]
+        assert result_df.loc[0, "species"] == "Escherichia coli"
+        assert result_df.loc[0, "barcode01"] == 2
+        assert result_df.loc[0, "barcode02"] == 2
+
     def test_csv_format_conversion_single_sample(self):
         """RED: Test conversion of Kraken2 output to project CSV format"""
         # Arrange - mock Kraken2 classification results
@@ -155,7 +155,7 @@ class TestPipelineIntegratorFallbackLogic:
         """RED: Test performance monitoring during classification selection"""
         from src.pipeline_integrator import MicrobiomePipelineIntegrator
         
-        with patch('time.time', side_effect=[0, 10, 20, 30]):  # Mock timing
+        with patch('time.monotonic_ns', side_effect=[0, 10_000_000_000, 20_000_000_000, 30_000_000_000]):  # Mock timing
             integrator = MicrobiomePipelineIntegrator(use_kraken2=True)
             
             # Mock processing
@@ -218,6 +218,29 @@ class TestEnvironmentConfigurationLoading:
             integrator = MicrobiomePipelineIntegrator.from_environment()
             assert isinstance(integrator.kraken2_threads, int)
 
+    def test_environment_changes_are_picked_up(self):
+        """Memoized parsing still reflects the current environment values"""
+        from src.pipeline_integrator import MicrobiomePipelineIntegrator
+
+        with patch.dict('os.environ', {'KRAKEN2_THREADS': '2'}):
+            assert MicrobiomePipelineIntegrator.from_environment().kraken2_threads == 2
+        with patch.dict('os.environ', {'KRAKEN2_THREADS': '6'}):
+            assert MicrobiomePipelineIntegrator.from_environment().kraken2_threads == 6
+
+    def test_removed_database_is_noticed(self, tmp_path, monkeypatch):
+        """Each integrator checks the database path afresh"""
+        from src.pipeline_integrator import MicrobiomePipelineIntegrator
+
+        monkeypatch.chdir(tmp_path)
+        db_dir = tmp_path / "db"
+        db_dir.mkdir()
+        env = {'KRAKEN2_DB_PATH': str(db_dir), 'USE_KRAKEN2': 'true'}
+        with patch.dict('os.environ', env), \
+                patch('src.pipeline_integrator.KRAKEN2_AVAILABLE', True):
+            assert MicrobiomePipelineIntegrator.from_environment().use_kraken2 is True
+            db_dir.rmdir()
+            assert MicrobiomePipelineIntegrator.from_environment().use_kraken2 is False
+
 
 class TestEndToEndFastqToCsv:
     """
@@ -258,6 +281,9 @@ class TestEndToEndFastqToCsv:
         assert 'csv_path' in result
         assert result['kraken2_used'] is True
         
+        # In-memory result is available without re-reading the CSV
+        assert list(result['dataframe'].columns) == list(expected_csv_data.columns)
+        
         # Verify CSV content matches expected format
         if 'csv_path' in result:
             saved_df = pd.read_csv(result['csv_path'])
@@ -265,7 +291,152 @@ class TestEndToEndFastqToCsv:
             assert 'barcode59' in saved_df.columns
             assert 'phylum' in saved_df.columns
             assert 'genus' in saved_df.columns
-    
+
+    def test_process_sample_accepts_in_memory_fastq(self, tmp_path):
+        """FASTQ content can be passed as bytes without writing it first"""
+        from src.pipeline_integrator import MicrobiomePipelineIntegrator
+        integrator = MicrobiomePipelineIntegrator(output_dir=str(tmp_path / "out"))
+
+        with patch.object(MicrobiomePipelineIntegrator, '_classify_with_biopython',
+                          side_effect=lambda files, name, barcode: pd.DataFrame({
+                              'species': [Path(files[0]).read_text().split()[0]],
+                              barcode: [1]})) as mock_classify:
+            result = integrator.process_sample(
+                fastq_file=b"@seq1\nATCG\n+\nIIII\n",
+                patient_info={'name': 'Test Patient'},
+                run_qc=False,
+                generate_pdf=False
+            )
+
+        assert result['sample_name'] == 'barcode59'
+        assert result['dataframe'].loc[0, 'species'] == '@seq1'
+        # The spilled FASTQ is removed once the sample is classified
+        assert not Path(mock_classify.call_args[0][0][0]).exists()
+
+    def test_process_sample_csv_is_written_before_returning(self, tmp_path):
+        """The CSV exists on return and write errors reach the caller"""
+        from src.pipeline_integrator import MicrobiomePipelineIntegrator
+        integrator = MicrobiomePipelineIntegrator(output_dir=str(tmp_path / "out"))
+        frame = pd.DataFrame({'species': ['A a'], 'barcode59': [3],
+                              'phylum': ['Bacillota'], 'genus': ['A']})
+        fastq_path = tmp_path / "s.fastq"
+        fastq_path.write_text("@seq1\nATCG\n+\nIIII\n")
+
+        with patch.object(MicrobiomePipelineIntegrator, '_classify_with_biopython',
+                          return_value=frame):
+            result = integrator.process_sample(str(fastq_path), {'name': 'Test'},
+                                               run_qc=False, generate_pdf=False)
+            assert pd.read_csv(result['csv_path']).equals(frame)
+
+            with patch('src.pipeline_integrator.write_abundance_csv',
+                       side_effect=OSError("disk full")):
+                with pytest.raises(OSError, match="disk full"):
+                    integrator.process_sample(str(fastq_path), {'name': 'Test'},
+                                              run_qc=False, generate_pdf=False)
+
+    def test_batch_classifies_all_samples_in_one_kraken2_run(self, tmp_path):
+        """batch_process loads the database once for the whole manifest"""
+        from src.pipeline_integrator import MicrobiomePipelineIntegrator
+        integrator = MicrobiomePipelineIntegrator(output_dir=str(tmp_path / "out"), use_kraken2=True,
+                                                  kraken2_db_path=str(tmp_path))
+        manager = self._batch_manager(pd.DataFrame({
+            'species': ['A a', 'B b', 'C c', 'D d'],
+            'S0': [5, 0, 2, 1],
+            'S1': [0, 7, 1, 3],
+            'phylum': ['Bacillota', 'Bacteroidota', 'Bacillota', 'Bacillota'],
+            'genus': ['A', 'B', 'C', 'D'],
+        }))
+        integrator._kraken2_manager = manager
+
+        with patch.object(manager, 'process_fastq') as mock_process:
+            results = self._run_batch(integrator)
+
+        manager.kraken2_classifier.classify_barcodes_to_csv.assert_called_once_with(
+            {'S0': ['one.fastq'], 'S1': ['two.fastq']})
+        mock_process.assert_not_called()
+        assert results[0]['dataframe']['species'].tolist() == ['A a', 'C c', 'D d']
+        assert results[1]['dataframe']['barcode2'].tolist() == [7, 1, 3]
+        assert all('batch_classification_seconds' in result for result in results)
+
+    def test_batch_rejected_sample_falls_back_without_rerun(self, tmp_path):
+        """A batched result failing the quality check goes straight to the fallback"""
+        from src.pipeline_integrator import MicrobiomePipelineIntegrator
+        integrator = MicrobiomePipelineIntegrator(output_dir=str(tmp_path / "out"), use_kraken2=True,
+                                                  kraken2_db_path=str(tmp_path))
+        manager = self._batch_manager(pd.DataFrame({
+            'species': ['A a', 'B b', 'C c'],
+            'S0': [5, 4, 2],
+            'S1': [0, 7, 0],
+            'phylum': ['Bacillota', 'Bacteroidota', 'Bacillota'],
+            'genus': ['A', 'B', 'C'],
+        }))
+        integrator._kraken2_manager = manager
+        fallback_df = pd.DataFrame({'species': ['F f'], 'barcode2': [1]})
+
+        with patch.object(manager, 'process_fastq') as mock_process, \
+                patch.object(integrator, '_classify_with_biopython', return_value=fallback_df):
+            results = self._run_batch(integrator)
+
+        mock_process.assert_not_called()
+        assert results[0]['kraken2_used'] is True
+        assert results[1]['classification_method'] == 'biopython_fallback'
+        assert 'batch_classification_seconds' not in results[1]
+        assert manager.fallback_attempts == 1
+
+    def test_batch_skips_database_rejected_by_manager(self, tmp_path):
+        """A manager that disabled Kraken2 (failed validation) is never run"""
+        from src.pipeline_integrator import MicrobiomePipelineIntegrator
+        integrator = MicrobiomePipelineIntegrator(output_dir=str(tmp_path / "out"), use_kraken2=True,
+                                                  kraken2_db_path=str(tmp_path))
+        manager = self._batch_manager(pd.DataFrame())
+        manager.use_kraken2 = False
+        integrator._kraken2_manager = manager
+
+        with patch.object(integrator, '_should_use_kraken2', return_value=True):
+            manifest = pd.DataFrame({'fastq_path': ['one.fastq'], 'sample_name': ['one']})
+            assert integrator._classify_manifest_with_kraken2(manifest) == {}
+        manager.kraken2_classifier.classify_barcodes_to_csv.assert_not_called()
+
+    def test_multibarcode_skips_database_rejected_by_manager(self, tmp_path):
+        """process_multibarcode uses the existing pipeline when the manager disabled Kraken2"""
+        from src.pipeline_integrator import MicrobiomePipelineIntegrator
+        integrator = MicrobiomePipelineIntegrator(output_dir=str(tmp_path / "out"), use_kraken2=True,
+                                                  kraken2_db_path=str(tmp_path))
+        manager = self._batch_manager(pd.DataFrame())
+        manager.use_kraken2 = False
+        integrator._kraken2_manager = manager
+        frame = pd.DataFrame({'species': ['A a'], 'barcode01': [4],
+                              'phylum': ['Bacillota'], 'genus': ['A']})
+
+        with patch.object(integrator, '_should_use_kraken2', return_value=True), \
+                patch.object(integrator, '_classify_with_biopython', return_value=frame):
+            result = integrator.process_multibarcode({'barcode01': ['one.fastq']})
+
+        manager.kraken2_classifier.classify_barcodes_to_csv.assert_not_called()
+        assert result['barcode01'].tolist() == [4]
+
+    @staticmethod
+    def _batch_manager(table):
+        """Fallback manager whose Kraken2 classifier returns table"""
+        from src.kraken2_classifier import Kraken2FallbackManager
+        manager = Kraken2FallbackManager("/test/db", fallback_processor_class=Mock(),
+                                         use_kraken2=False)
+        manager.use_kraken2 = True
+        manager.kraken2_classifier = Mock()
+        manager.kraken2_classifier.classify_barcodes_to_csv.return_value = table
+        return manager
+
+    @staticmethod
+    def _run_batch(integrator):
+        manifest = pd.DataFrame({'fastq_path': ['one.fastq', 'two.fastq'],
+                                 'sample_name': ['one', 'two'],
+                                 'barcode_num': [1, 2]})
+        with patch.object(integrator, '_should_use_kraken2', return_value=True), \
+                patch('src.pipeline_integrator.FASTQQualityControl'), \
+                patch('src.pipeline_integrator.ReportGenerator'), \
+                patch.object(integrator, '_generate_batch_summary'):
+            return integrator.batch_process(manifest)
+
     @patch('src.fastq_qc.FASTQQualityControl')
     @patch('src.kraken2_classifier.Kraken2FallbackManager')
     def test_end_to_end_with_quality_control_integration(self, 
@@ -366,4 +537,29 @@ class TestKraken2IntegrationConfiguration:
 
 # TDD Phase 2 RED Complete
 # These integration tests should FAIL until pipeline_integrator.py is modified
-# Next: Implement the integration functionality (GREEN phase)
\ No newline at end of file
+# Next: Implement the integration functionality (GREEN phase)
+
+class TestAbundanceCSVWriter:
+    """Fast CSV writer must produce exactly what DataFrame.to_csv produces."""
+
+    @pytest.mark.parametrize("df", [
+        pd.DataFrame({
+            'species': ['Escherichia coli', 'Weird, "quoted" name', 'Line\nbreak'],
+            'barcode01': [1500, 0, 7],
+            'barcode02': [3, 4, 5],
+            'phylum': ['Pseudomonadota', 'Bacillota', 'Bacillota'],
+            'genus': ['Escherichia', 'Weird', 'Line']
+        }),
+        pd.DataFrame({'species': ['A', None], 'barcode01': [1, 2]}),
+        pd.DataFrame({'species': ['A', 'B'], 'barcode01': [1.5, 2.0]}),
+        pd.DataFrame(columns=['species', 'barcode59', 'phylum', 'genus']),
+    ], ids=['abundance-table', 'missing-values', 'float-counts', 'empty'])
+    def test_output_matches_pandas(self, df, tmp_path):
+        from src.pipeline_integrator import write_abundance_csv
+
+        expected = tmp_path / "expected.csv"
+        actual = tmp_path / "actual.csv"
+        df.to_csv(expected, index=False)
+        write_abundance_csv(df, actual)
+
+        assert actual.read_bytes() == expected.read_bytes()
@@ -98,18 +98,10 @@ class TestExplicitBarcodeProcessing:
         if not multibarcode_csv.exists():
             pytest.skip("Feedback CSV files not available")
 
-        # Process each barcode
-        processor_23 = CSVProcessor(str(multibarcode_csv), barcode_column='barcode23')
-        processor_24 = CSVProcessor(str(multibarcode_csv), barcode_column='barcode24')
-        processor_25 = CSVProcessor(str(multibarcode_csv), barcode_column='barcode25')
+        totals = CSVProcessor.barcode_totals(str(multibarcode_csv))
+        counts = {totals['barcode23'], totals['barcode24'], totals['barcode25']}
 
         # Each should have different total counts (different horses)
-        counts = {
-            processor_23.total_count,
-            processor_24.total_count,
-            processor_25.total_count
-        }
-
         # At least some should be different (same count would be coincidence)
         # Note: This test may need adjustment if data happens to have identical counts
         assert len(counts) >= 2, "Expected different horses to have different read counts"
@@ -215,3 +207,12 @@ class TestBarcodeColumnEdgeCases:
 
         # Should only find columns STARTING with 'barcode'
         assert columns == ['barcode01']
+
+    def test_quoted_and_crlf_header(self, tmp_path):
+        """Header is read without parsing rows; quotes and CRLF are handled"""
+        csv_path = tmp_path / "quoted.csv"
+        csv_path.write_bytes(b'"species","barcode01","barcode02"\r\n"A",1,2\r\n')
+
+        columns = CSVProcessor.get_all_barcode_columns(str(csv_path))
+
+        assert columns == ['barcode01', 'barcode02']
@@ -11,8 +11,11 @@ project_root = Path(__file__).parent
 src_path = project_root / "src"
 sys.path.insert(0, str(src_path))
 
-from src.real_fastq_processor import process_fastq_directories_to_csv
+from src.real_fastq_processor import process_fastq_directories_to_csv, open_fastq, RealFASTQProcessor, list_fastq_files, prefetch_fastq_files
+import gzip
 import logging
+import pytest
+from collections import Counter
 
 def test_real_fastq_processing():
     """Test real FASTQ processing with a subset of files"""
@@ -30,7 +33,7 @@ def test_real_fastq_processing():
     for barcode_dir in barcode_dirs:
         barcode_path = data_path / barcode_dir
         if barcode_path.exists():
-            fastq_count = len(list(barcode_path.glob('*.fastq.gz')))
+            fastq_count = len(list_fastq_files(barcode_path, suffixes=('.fastq.gz',)))
             print(f"✅ {barcode_dir}: {fastq_count} FASTQ files")
         else:
             print(f"❌ {barcode_dir}: Directory missing")
@@ -69,6 +72,83 @@ def test_real_fastq_processing():
         traceback.print_exc()
         return False
 
+def test_open_fastq_threaded_gzip_matches_gzip_open(tmp_path, monkeypatch):
+    """Background-thread decompression yields the same lines as gzip.open"""
+    fastq = tmp_path / "reads.fastq.gz"
+    with gzip.open(fastq, 'wt') as f:
+        for i in range(2000):
+            f.write(f"@read{i}\n{'ACGT' * 40}\n+\n{'I' * 160}\n")
+
+    # Force the pure-Python reader even when pigz is installed
+    monkeypatch.setattr('shutil.which', lambda name: None)
+    with open_fastq(fastq) as f:
+        threaded = f.readlines()
+
+    with gzip.open(fastq, 'rt') as f:
+        assert threaded == f.readlines()
+
+def test_barcode_directories_processed_in_parallel(tmp_path):
+    """Worker processes produce the same table as sequential processing"""
+    for barcode, kmer in (("barcode04", "ACTGCGTGC"), ("barcode05", "TGGCGTGCA")):
+        (tmp_path / barcode).mkdir()
+        with gzip.open(tmp_path / barcode / "reads.fastq.gz", 'wt') as f:
+            for i in range(50):
+                f.write(f"@read{i}\n{kmer * 12}\n+\n{'I' * 108}\n")
+
+    processor = RealFASTQProcessor()
+    barcodes = ["barcode04", "barcode05"]
+    parallel = processor.process_barcode_directories(str(tmp_path), barcodes, max_workers=2)
+    sequential = processor.process_barcode_directories(str(tmp_path), barcodes, max_workers=1)
+
+    assert parallel.equals(sequential)
+    assert parallel['total'].sum() == 100
+
+def test_streaming_species_counts_match_classifications(tmp_path):
+    """Streaming counts agree with counting the full list of classifications"""
+    with open(tmp_path / "reads.fastq", 'w') as f:
+        for i, kmer in enumerate(["ACTGCGTGC", "TGGCGTGCA", "ACTGCGTGC", "NNNNNNNNN"] * 10):
+            f.write(f"@read{i}\n{kmer * 12}\n+\n{'I' * 108}\n")
+
+    processor = RealFASTQProcessor()
+    counts, stats = processor.count_barcode_species(str(tmp_path))
+    classifications, full_stats = processor.process_barcode_directory(str(tmp_path))
+
+    assert counts == Counter(hit.species for hit in classifications)
+    assert stats == full_stats
+    assert stats.classified_reads == 30
+
+def test_pyfastx_reader_matches_python_reader(tmp_path, monkeypatch):
+    """pyfastx-backed parsing yields the same reads as the Python loop"""
+    pytest.importorskip("pyfastx")
+    import src.real_fastq_processor as real_fastq_processor
+
+    fastq = tmp_path / "reads.fastq.gz"
+    with gzip.open(fastq, 'wt') as f:
+        for i in range(100):
+            f.write(f"@read{i} runid=abc\n{'ACTGCGTGC' * 12}\n+\n{'I' * 108}\n")
+
+    with_pyfastx = list(RealFASTQProcessor._iter_reads(fastq))
+    monkeypatch.setattr(real_fastq_processor, 'HAS_PYFASTX', False)
+    without_pyfastx = list(RealFASTQProcessor._iter_reads(fastq))
+
+    assert with_pyfastx == without_pyfastx
+
+def test_list_fastq_files_matches_glob(tmp_path):
+    """scandir listing returns the same files as the glob patterns it replaces"""
+    for name in ["a.fastq.gz", "b.fastq", "notes.txt", "c.fastq.gz.md5", ".hidden.fastq"]:
+        (tmp_path / name).write_text("")
+    (tmp_path / "subdir.fastq").mkdir()
+
+    expected = list(tmp_path.glob('*.fastq.gz')) + [p for p in tmp_path.glob('*.fastq') if p.is_file()]
+    assert sorted(list_fastq_files(tmp_path)) == sorted(expected)
+
+def test_prefetch_fastq_files_tolerates_missing_files(tmp_path):
+    """Readahead hints are best-effort and never raise"""
+    present = tmp_path / "reads.fastq"
+    present.write_text("@read1\nACGT\n+\nIIII\n")
+
+    prefetch_fastq_files([present, tmp_path / "missing.fastq"])
+
 if __name__ == "__main__":
     success = test_real_fastq_processing()
     if success:
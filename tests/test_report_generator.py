@@ -3,21 +3,97 @@ Comprehensive tests for report generator module
 Tests the main orchestrator for PDF report generation from microbiome data
 """
 
+import re
 import pytest
-import tempfile
 import yaml
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
 from pathlib import Path
-from unittest.mock import Mock, patch, MagicMock
+from unittest.mock import DEFAULT, Mock, patch, MagicMock, mock_open
 
 from src.report_generator import ReportGenerator
 from src.data_models import PatientInfo, MicrobiomeData
 from tests.fixtures.patient_data import get_default_patient, get_sample_patient_data
 from tests.fixtures.microbiome_data import get_microbiome_by_category
-from tests.fixtures.report_data import create_sample_patient, create_sample_microbiome
-from tests.utils.pdf_validation import (
-    validate_pdf_structure,
-    count_pdf_pages
+from tests.fixtures.report_data import create_sample_microbiome
+
+
+# Message of a missing-template error (e.g. jinja2 TemplateNotFound)
+TEMPLATE_ERROR_RE = re.compile(r"template|not found", re.IGNORECASE)
+
+# Language with no templates, shared by both missing-template tests; they
+# also run on one xdist worker.
+MISSING_TEMPLATE_LANGUAGE = "nonexistent_lang_test"
+
+SAMPLE_CSV_BYTES = (
+    b"species,barcode59,phylum,genus\n"
+    b"Lactobacillus acidophilus,1850,Bacillota,Lactobacillus\n"
+    b"Bacteroides fragilis,1480,Bacteroidota,Bacteroides\n"
+    b"Faecalibacterium prausnitzii,1970,Bacillota,Faecalibacterium\n"
+    b"Escherichia coli,290,Pseudomonadota,Escherichia\n"
+    b"Bifidobacterium bifidum,860,Actinomycetota,Bifidobacterium\n"
 )
+SINGLE_SPECIES_CSV_BYTES = b"species,barcode59,phylum,genus\nTest species,100,Bacillota,Test\n"
+
+
+@pytest.fixture(scope="session")
+def sample_csv_path(tmp_path_factory):
+    """Sample CSV written once per session; tests only read it"""
+    csv_path = tmp_path_factory.mktemp("report_input") / "test_sample.csv"
+    csv_path.write_bytes(SAMPLE_CSV_BYTES)
+    return str(csv_path)
+
+
+@pytest.fixture(scope="session")
+def concurrent_csv_path(tmp_path_factory):
+    """Single-species CSV read by every concurrent report"""
+    csv_path = tmp_path_factory.mktemp("concurrent") / "input.csv"
+    csv_path.write_bytes(SINGLE_SPECIES_CSV_BYTES)
+    return str(csv_path)
+
+
+@pytest.fixture(scope="session")
+def large_microbiome_data():
+    """1000-species dataset built once; tests only read it"""
+    species = [
+        {"name": f"Test species {i}", "percentage": 0.1, "phylum": "Bacillota"}
+        for i in range(1000)
+    ]
+    return MicrobiomeData(species_list=species, total_species_count=1000, dysbiosis_index=25.0)
+
+
+@pytest.fixture(scope="module")
+def generator():
+    """Generator shared by the module; tests only read it or patch it per test"""
+    return ReportGenerator(language="en")
+
+
+# Default behaviour for the chart/PDF collaborators. Each test gets fresh
+# mocks built from these so call records never leak between tests.
+CHART_GENERATOR_MOCK_CONFIG = {
+    "generate_all_charts.return_value": {},
+    "cleanup.return_value": None,
+}
+PDF_BUILDER_MOCK_CONFIG = {"build_from_content.return_value": True}
+
+
+@pytest.fixture
+def mock_chart_gen():
+    return Mock(**CHART_GENERATOR_MOCK_CONFIG)
+
+
+@pytest.fixture
+def mock_pdf():
+    return Mock(**PDF_BUILDER_MOCK_CONFIG)
+
+
+@pytest.fixture
+def patched_report_deps(mock_chart_gen, mock_pdf):
+    """Patch ChartGenerator and PDFBuilder in one go; yields (chart_gen, pdf) instances"""
+    with patch.multiple('src.report_generator', ChartGenerator=DEFAULT, PDFBuilder=DEFAULT) as classes:
+        classes['ChartGenerator'].return_value = mock_chart_gen
+        classes['PDFBuilder'].return_value = mock_pdf
+        yield mock_chart_gen, mock_pdf
 
 
 class TestReportGeneratorInitialization:
@@ -61,7 +137,9 @@ class TestReportGeneratorInitialization:
         assert "Bacteroidota" in ranges
         assert ranges["Bacillota"] == [20.0, 70.0]
     
-    @patch('builtins.open', side_effect=FileNotFoundError)
+    # Shadow open() only inside src.report_generator; template loaders and
+    # everything else keep the real builtin
+    @patch('src.report_generator.open', side_effect=FileNotFoundError, create=True)
     def test_fallback_config_when_file_missing(self, mock_open):
         """Test fallback to default config when file is missing"""
         generator = ReportGenerator()
@@ -76,18 +154,6 @@ class TestReportGeneratorInitialization:
 class TestTemplateRendering:
     """Test template rendering functionality"""
     
-    @pytest.fixture
-    def generator(self):
-        return ReportGenerator(language="en")
-    
-    @pytest.fixture
-    def sample_patient(self):
-        return create_sample_patient()
-    
-    @pytest.fixture
-    def sample_microbiome(self):
-        return create_sample_microbiome("normal")
-    
     @pytest.fixture
     def mock_chart_paths(self):
         return {
@@ -96,59 +162,60 @@ class TestTemplateRendering:
             "dysbiosis_gauge": "/tmp/dysbiosis_gauge.png"
         }
     
-    def test_template_rendering_success(self, generator, sample_patient, sample_microbiome, mock_chart_paths):
+    def test_template_rendering_success(self, generator, report_patient, sample_microbiome_normal, mock_chart_paths):
         """Test successful template rendering"""
-        content = generator._render_template(sample_patient, sample_microbiome, mock_chart_paths)
+        content = generator._render_template(report_patient, sample_microbiome_normal, mock_chart_paths)
         
         assert content is not None
         assert len(content) > 0
         assert isinstance(content, str)
         
         # Check that patient info appears in rendered content
-        assert sample_patient.name in content
-        assert sample_patient.sample_number in content
+        assert report_patient.name in content
+        assert report_patient.sample_number in content
     
-    def test_template_rendering_with_different_languages(self, sample_patient, sample_microbiome, mock_chart_paths):
+    def test_template_rendering_with_different_languages(self, report_patient, sample_microbiome_normal, mock_chart_paths):
         """Test template rendering with different language configurations"""
         # Test English (should work)
         generator_en = ReportGenerator(language="en")
-        content_en = generator_en._render_template(sample_patient, sample_microbiome, mock_chart_paths)
+        content_en = generator_en._render_template(report_patient, sample_microbiome_normal, mock_chart_paths)
         assert content_en is not None
         assert len(content_en) > 0
         
         # Test Polish (may not have templates yet, should handle gracefully)
         try:
             generator_pl = ReportGenerator(language="pl")
-            content_pl = generator_pl._render_template(sample_patient, sample_microbiome, mock_chart_paths)
+            content_pl = generator_pl._render_template(report_patient, sample_microbiome_normal, mock_chart_paths)
             # If it succeeds, content should be valid
             if content_pl:
                 assert len(content_pl) > 0
         except Exception as e:
             # If templates don't exist, should get TemplateNotFound
-            assert "template" in str(e).lower() or "not found" in str(e).lower()
+            assert TEMPLATE_ERROR_RE.search(str(e))
     
-    def test_template_rendering_missing_template(self):
+    @pytest.mark.xdist_group("template_errors")
+    def test_template_rendering_missing_template(self, report_patient, sample_microbiome_normal):
         """Test template rendering with non-existent language"""
-        generator = ReportGenerator(language="nonexistent")
+        generator = ReportGenerator(language=MISSING_TEMPLATE_LANGUAGE)
         
         with pytest.raises(Exception) as exc_info:
             generator._render_template(
-                create_sample_patient(),
-                create_sample_microbiome("normal"),
+                report_patient,
+                sample_microbiome_normal,
                 {}
             )
         
         # Should be TemplateNotFound or similar error
-        assert "template" in str(exc_info.value).lower() or "not found" in str(exc_info.value).lower()
+        assert TEMPLATE_ERROR_RE.search(str(exc_info.value))
     
-    def test_template_context_variables(self, generator, sample_patient, sample_microbiome, mock_chart_paths):
+    def test_template_context_variables(self, generator, report_patient, sample_microbiome_normal, mock_chart_paths):
         """Test that all expected context variables are passed to template"""
         with patch.object(generator.env, 'get_template') as mock_get_template:
             mock_template = Mock()
             mock_get_template.return_value = mock_template
             mock_template.render.return_value = "test content"
             
-            generator._render_template(sample_patient, sample_microbiome, mock_chart_paths)
+            generator._render_template(report_patient, sample_microbiome_normal, mock_chart_paths)
             
             # Check template.render was called with correct context
             mock_template.render.assert_called_once()
@@ -160,8 +227,8 @@ class TestTemplateRendering:
             assert "lang" in call_args
             assert "charts" in call_args
             
-            assert call_args["patient"] == sample_patient
-            assert call_args["data"] == sample_microbiome
+            assert call_args["patient"] == report_patient
+            assert call_args["data"] == sample_microbiome_normal
             assert call_args["lang"] == "en"
             assert call_args["charts"] == mock_chart_paths
 
@@ -169,126 +236,67 @@ class TestTemplateRendering:
 class TestClinicalInterpretation:
     """Test clinical interpretation generation"""
     
-    @pytest.fixture
-    def generator(self):
-        return ReportGenerator()
-    
-    def test_normal_clinical_interpretation(self, generator):
-        """Test clinical interpretation for normal microbiome"""
-        data = create_sample_microbiome("normal")
-        interpretation = generator._generate_clinical_text(data)
-        
-        assert "normal" in interpretation.lower()
-        assert "healthy" in interpretation.lower() or "balanced" in interpretation.lower()
-    
-    def test_mild_dysbiosis_interpretation(self, generator):
-        """Test clinical interpretation for mild dysbiosis"""
-        data = create_sample_microbiome("mild")
-        interpretation = generator._generate_clinical_text(data)
-        
-        assert "mild" in interpretation.lower()
-        assert "dysbiosis" in interpretation.lower()
-        assert "moderate" in interpretation.lower() or "imbalance" in interpretation.lower()
-    
-    def test_severe_dysbiosis_interpretation(self, generator):
-        """Test clinical interpretation for severe dysbiosis"""
-        data = create_sample_microbiome("dysbiotic")
-        interpretation = generator._generate_clinical_text(data)
-        
-        assert "severe" in interpretation.lower()
-        assert "dysbiosis" in interpretation.lower()
-        assert "significant" in interpretation.lower() or "intervention" in interpretation.lower()
+    @pytest.mark.parametrize("level,expected_keywords", [
+        ("normal", ["normal", ("healthy", "balanced")]),
+        ("mild", ["mild", "dysbiosis", ("moderate", "imbalance")]),
+        ("dysbiotic", ["severe", "dysbiosis", ("significant", "intervention")]),
+    ], ids=["normal", "mild", "severe"])
+    def test_clinical_interpretation(self, generator, level, expected_keywords):
+        """Test clinical interpretation for each dysbiosis level"""
+        data = create_sample_microbiome(level)
+        text = generator._generate_clinical_text(data).lower()
+        
+        # A tuple means any one of its keywords is enough
+        for keyword in expected_keywords:
+            alternatives = keyword if isinstance(keyword, tuple) else (keyword,)
+            assert any(word in text for word in alternatives)
 
 
 class TestRecommendationsGeneration:
     """Test recommendations generation based on dysbiosis levels"""
     
-    @pytest.fixture
-    def generator(self):
-        return ReportGenerator()
-    
-    def test_normal_recommendations(self, generator):
-        """Test recommendations for normal dysbiosis index"""
-        data = MicrobiomeData(dysbiosis_index=15.0)  # Normal range
+    @pytest.mark.parametrize("dysbiosis_index,expected_keywords", [
+        (15.0, ["continue", ("monitoring", "monitor")]),                     # Normal range
+        (35.0, ["probiotic", "diet", ("retest", "weeks")]),                  # Mild range
+        (75.0, [("intervention", "immediate"), "veterinary", "probiotic"]),  # Severe range
+    ], ids=["normal", "mild", "severe"])
+    def test_recommendations(self, generator, dysbiosis_index, expected_keywords):
+        """Test recommendations for each dysbiosis range"""
+        data = MicrobiomeData(dysbiosis_index=dysbiosis_index)
         recommendations = generator._get_recommendations(data)
         
         assert len(recommendations) > 0
-        assert any("continue" in rec.lower() for rec in recommendations)
-        assert any("monitoring" in rec.lower() or "monitor" in rec.lower() for rec in recommendations)
-    
-    def test_mild_dysbiosis_recommendations(self, generator):
-        """Test recommendations for mild dysbiosis"""
-        data = MicrobiomeData(dysbiosis_index=35.0)  # Mild range
-        recommendations = generator._get_recommendations(data)
-        
-        assert len(recommendations) > 0
-        assert any("probiotic" in rec.lower() for rec in recommendations)
-        assert any("diet" in rec.lower() for rec in recommendations)
-        assert any("retest" in rec.lower() or "weeks" in rec.lower() for rec in recommendations)
-    
-    def test_severe_dysbiosis_recommendations(self, generator):
-        """Test recommendations for severe dysbiosis"""
-        data = MicrobiomeData(dysbiosis_index=75.0)  # Severe range
-        recommendations = generator._get_recommendations(data)
-        
-        assert len(recommendations) > 0
-        assert any("intervention" in rec.lower() or "immediate" in rec.lower() for rec in recommendations)
-        assert any("veterinary" in rec.lower() for rec in recommendations)
-        assert any("probiotic" in rec.lower() for rec in recommendations)
+        recs_lower = [rec.lower() for rec in recommendations]
+        # Each keyword (or one of a tuple of keywords) appears in some recommendation
+        for keyword in expected_keywords:
+            alternatives = keyword if isinstance(keyword, tuple) else (keyword,)
+            assert any(word in rec for rec in recs_lower for word in alternatives)
 
 
 class TestReportGeneration:
     """Test complete report generation workflow"""
     
     @pytest.fixture
-    def generator(self):
-        return ReportGenerator(language="en")
-    
-    @pytest.fixture
-    def sample_patient(self):
-        return create_sample_patient()
-    
-    @pytest.fixture
-    def temp_output_dir(self):
-        with tempfile.TemporaryDirectory() as tmpdir:
-            yield Path(tmpdir)
-    
-    @pytest.fixture
-    def sample_csv_path(self, temp_output_dir):
-        """Create a sample CSV file for testing"""
-        csv_content = """species,barcode59,phylum,genus
-Lactobacillus acidophilus,1850,Bacillota,Lactobacillus
-Bacteroides fragilis,1480,Bacteroidota,Bacteroides
-Faecalibacterium prausnitzii,1970,Bacillota,Faecalibacterium
-Escherichia coli,290,Pseudomonadota,Escherichia
-Bifidobacterium bifidum,860,Actinomycetota,Bifidobacterium
-"""
-        csv_path = temp_output_dir / "test_sample.csv"
-        csv_path.write_text(csv_content)
-        return str(csv_path)
+    def temp_output_dir(self, tmp_path):
+        return tmp_path
     
     @patch('src.report_generator.ChartGenerator')
     @patch('src.report_generator.PDFBuilder')
     def test_successful_report_generation(self, mock_pdf_builder, mock_chart_generator, 
-                                        generator, sample_patient, sample_csv_path, temp_output_dir):
+                                        generator, report_patient, sample_csv_path, temp_output_dir,
+                                        mock_chart_gen, mock_pdf):
         """Test successful end-to-end report generation"""
-        # Mock chart generator
-        mock_chart_gen = Mock()
         mock_chart_generator.return_value = mock_chart_gen
         mock_chart_gen.generate_all_charts.return_value = {
             "species_pie": "/tmp/pie.png",
             "phylum_bar": "/tmp/bar.png"
         }
-        
-        # Mock PDF builder
-        mock_pdf = Mock()
         mock_pdf_builder.return_value = mock_pdf
-        mock_pdf.build_from_content.return_value = True
         
         output_path = str(temp_output_dir / "test_report.pdf")
         
         # Generate report
-        success = generator.generate_report(sample_csv_path, sample_patient, output_path)
+        success = generator.generate_report(sample_csv_path, report_patient, output_path)
         
         assert success is True
         
@@ -299,102 +307,68 @@ Bifidobacterium bifidum,860,Actinomycetota,Bifidobacterium
         # Verify PDF builder was called
         mock_pdf.build_from_content.assert_called_once()
     
-    @patch('src.report_generator.CSVProcessor')
-    def test_report_generation_csv_error(self, mock_csv_processor, generator, sample_patient, temp_output_dir):
-        """Test report generation with CSV processing error"""
-        # Mock CSV processor to raise exception
-        mock_processor = Mock()
-        mock_csv_processor.return_value = mock_processor
-        mock_processor.process.side_effect = Exception("CSV processing error")
-        
-        output_path = str(temp_output_dir / "test_report.pdf")
-        
-        # Should handle error gracefully
-        success = generator.generate_report("nonexistent.csv", sample_patient, output_path)
-        
-        assert success is False
-    
-    @patch('src.report_generator.ChartGenerator')
-    def test_report_generation_chart_error(self, mock_chart_generator, generator, 
-                                         sample_patient, sample_csv_path, temp_output_dir):
-        """Test report generation with chart generation error"""
-        # Mock chart generator to raise exception
-        mock_chart_gen = Mock()
-        mock_chart_generator.return_value = mock_chart_gen
-        mock_chart_gen.generate_all_charts.side_effect = Exception("Chart generation error")
+    @pytest.mark.parametrize("failure_point,mock_target,side_effect", [
+        ("csv", "src.report_generator.CSVProcessor", Exception("CSV processing error")),
+        ("chart", "src.report_generator.ChartGenerator", Exception("Chart generation error")),
+        ("pdf", "src.report_generator.PDFBuilder", None),
+    ])
+    def test_report_generation_error(self, failure_point, mock_target, side_effect, generator,
+                                     report_patient, sample_csv_path, temp_output_dir,
+                                     mock_chart_gen, mock_pdf):
+        """Test report generation fails gracefully when any stage fails"""
+        csv_path = sample_csv_path
+        if failure_point == "csv":
+            failing = Mock()
+            failing.process.side_effect = side_effect
+            csv_path = "nonexistent.csv"
+        elif failure_point == "chart":
+            failing = mock_chart_gen
+            failing.generate_all_charts.side_effect = side_effect
+        else:
+            # PDF builder reports failure rather than raising
+            failing = mock_pdf
+            failing.build_from_content.return_value = False
         
         output_path = str(temp_output_dir / "test_report.pdf")
         
-        # Should handle error gracefully
-        success = generator.generate_report(sample_csv_path, sample_patient, output_path)
+        with ExitStack() as stack:
+            stack.enter_context(patch(mock_target, return_value=failing))
+            if failure_point == "pdf":
+                # Charts must succeed for the PDF stage to be reached
+                stack.enter_context(patch('src.report_generator.ChartGenerator', return_value=mock_chart_gen))
+            
+            # Should handle error gracefully
+            success = generator.generate_report(csv_path, report_patient, output_path)
         
         assert success is False
     
-    @patch('src.report_generator.ChartGenerator')
-    @patch('src.report_generator.PDFBuilder')
-    def test_report_generation_pdf_error(self, mock_pdf_builder, mock_chart_generator,
-                                       generator, sample_patient, sample_csv_path, temp_output_dir):
-        """Test report generation with PDF building error"""
-        # Mock chart generator to succeed
-        mock_chart_gen = Mock()
-        mock_chart_generator.return_value = mock_chart_gen
-        mock_chart_gen.generate_all_charts.return_value = {}
-        
-        # Mock PDF builder to fail
-        mock_pdf = Mock()
-        mock_pdf_builder.return_value = mock_pdf
-        mock_pdf.build_from_content.return_value = False
-        
+    def test_html_output_generation(self, generator, report_patient, sample_csv_path, temp_output_dir,
+                                    patched_report_deps):
+        """Test that HTML output is generated for debugging"""
         output_path = str(temp_output_dir / "test_report.pdf")
+        html_path = str(temp_output_dir / "test_report.html")
         
-        # Should handle error gracefully
-        success = generator.generate_report(sample_csv_path, sample_patient, output_path)
+        # Generate report
+        success = generator.generate_report(sample_csv_path, report_patient, output_path)
         
-        assert success is False
-    
-    def test_html_output_generation(self, generator, sample_patient, sample_csv_path, temp_output_dir):
-        """Test that HTML output is generated for debugging"""
-        with patch('src.report_generator.ChartGenerator') as mock_chart_gen_class, \
-             patch('src.report_generator.PDFBuilder') as mock_pdf_builder_class:
-            
-            # Setup mocks
-            mock_chart_gen = Mock()
-            mock_chart_gen_class.return_value = mock_chart_gen
-            mock_chart_gen.generate_all_charts.return_value = {}
-            mock_chart_gen.cleanup.return_value = None
-            
-            mock_pdf = Mock()
-            mock_pdf_builder_class.return_value = mock_pdf
-            mock_pdf.build_from_content.return_value = True
-            
-            output_path = str(temp_output_dir / "test_report.pdf")
-            html_path = str(temp_output_dir / "test_report.html")
-            
-            # Generate report
-            success = generator.generate_report(sample_csv_path, sample_patient, output_path)
+        # Only check HTML if report generation succeeded
+        if success:
+            # Check HTML file was created
+            assert Path(html_path).exists()
             
-            # Only check HTML if report generation succeeded
-            if success:
-                # Check HTML file was created
-                assert Path(html_path).exists()
-                
-                # Verify HTML content
-                html_content = Path(html_path).read_text()
-                assert len(html_content) > 0
-                assert sample_patient.name in html_content
-            else:
-                # If report generation failed, test should still pass
-                # as HTML generation is a nice-to-have debug feature
-                pass
+            # Verify HTML content
+            html_content = Path(html_path).read_text()
+            assert len(html_content) > 0
+            assert report_patient.name in html_content
+        else:
+            # If report generation failed, test should still pass
+            # as HTML generation is a nice-to-have debug feature
+            pass
 
 
 class TestErrorHandling:
     """Test error handling in various scenarios"""
     
-    @pytest.fixture
-    def generator(self):
-        return ReportGenerator()
-    
     def test_invalid_patient_data_handling(self, generator):
         """Test handling of invalid patient data"""
         # Create some invalid patient data scenarios
@@ -411,23 +385,24 @@ class TestErrorHandling:
             # This might not cause immediate errors but should be handled in full workflow
             assert patient is not None
     
-    def test_missing_template_directory(self):
+    @pytest.mark.xdist_group("template_errors")
+    def test_missing_template_directory(self, report_patient, sample_microbiome_normal):
         """Test handling when template directory doesn't exist"""
         # ReportGenerator doesn't raise exception for missing language, it falls back
         # Let's test that it uses fallback template loader or raises appropriate error
         try:
-            generator = ReportGenerator(language="completely_nonexistent_language")
+            generator = ReportGenerator(language=MISSING_TEMPLATE_LANGUAGE)
             # If initialization succeeds, template rendering should fail
             with pytest.raises(Exception) as exc_info:
                 generator._render_template(
-                    create_sample_patient(),
-                    create_sample_microbiome("normal"),
+                    report_patient,
+                    sample_microbiome_normal,
                     {}
                 )
-            assert "template" in str(exc_info.value).lower() or "not found" in str(exc_info.value).lower()
+            assert TEMPLATE_ERROR_RE.search(str(exc_info.value))
         except Exception as e:
             # If initialization itself fails, that's also acceptable
-            assert "template" in str(e).lower() or "not found" in str(e).lower()
+            assert TEMPLATE_ERROR_RE.search(str(e))
     
     def test_corrupted_config_handling(self):
         """Test handling of corrupted configuration"""
@@ -451,26 +426,9 @@ class TestErrorHandling:
 class TestPerformanceAndResources:
     """Test performance and resource usage"""
     
-    @pytest.fixture
-    def generator(self):
-        return ReportGenerator()
-    
-    def test_memory_usage_large_dataset(self, generator):
+    def test_memory_usage_large_dataset(self, generator, large_microbiome_data):
         """Test memory usage with large microbiome datasets"""
-        # Create large dataset
-        large_species_list = []
-        for i in range(1000):
-            large_species_list.append({
-                "name": f"Test species {i}",
-                "percentage": 0.1,
-                "phylum": "Bacillota"
-            })
-        
-        large_data = MicrobiomeData(
-            species_list=large_species_list,
-            total_species_count=1000,
-            dysbiosis_index=25.0
-        )
+        large_data = large_microbiome_data
         
         # Should handle large datasets without memory issues
         interpretation = generator._generate_clinical_text(large_data)
@@ -479,54 +437,29 @@ class TestPerformanceAndResources:
         assert interpretation is not None
         assert len(recommendations) > 0
     
+    @pytest.mark.slow
     @patch('src.report_generator.ChartGenerator')
     @patch('src.report_generator.PDFBuilder') 
-    def test_concurrent_generation_safety(self, mock_pdf_builder, mock_chart_generator):
+    def test_concurrent_generation_safety(self, mock_pdf_builder, mock_chart_generator,
+                                          mock_chart_gen, mock_pdf, concurrent_csv_path, tmp_path):
         """Test that multiple reports can be generated simultaneously"""
-        import threading
-        import time
-        
-        # Mock dependencies
-        mock_chart_gen = Mock()
         mock_chart_generator.return_value = mock_chart_gen
-        mock_chart_gen.generate_all_charts.return_value = {}
-        
-        mock_pdf = Mock()
         mock_pdf_builder.return_value = mock_pdf
-        mock_pdf.build_from_content.return_value = True
-        
-        results = []
         
         def generate_report(report_id):
-            generator = ReportGenerator()
+            # Each thread builds its own generator; the shared fixture is not thread-safe
+            generator = ReportGenerator(language="en")
             patient = PatientInfo(name=f"Patient {report_id}", sample_number=f"T{report_id}")
-            
-            with tempfile.NamedTemporaryFile(suffix='.csv', mode='w', delete=False) as f:
-                f.write("species,barcode59,phylum,genus\nTest species,100,Bacillota,Test\n")
-                csv_path = f.name
-            
-            with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as f:
-                pdf_path = f.name
+            pdf_path = str(tmp_path / f"report_{report_id}.pdf")
             
             try:
-                success = generator.generate_report(csv_path, patient, pdf_path)
-                results.append(success)
-            except Exception as e:
-                results.append(False)
-            finally:
-                Path(csv_path).unlink(missing_ok=True)
-                Path(pdf_path).unlink(missing_ok=True)
+                return generator.generate_report(concurrent_csv_path, patient, pdf_path)
+            except Exception:
+                return False
         
         # Generate multiple reports concurrently
-        threads = []
-        for i in range(5):
-            thread = threading.Thread(target=generate_report, args=(i,))
-            threads.append(thread)
-            thread.start()
-        
-        # Wait for all threads to complete
-        for thread in threads:
-            thread.join()
+        with ThreadPoolExecutor(max_workers=5) as executor:
+            results = list(executor.map(generate_report, range(5)))
         
         # All should succeed
         assert len(results) == 5
@@ -535,10 +468,13 @@ class TestPerformanceAndResources:
 
 # Helper functions for mocking
 
+# Built once; mock_open rewinds read_data on every call, so reuse is safe
+_CORRUPTED_YAML_OPEN = mock_open(read_data="invalid: yaml: content: [unclosed")
+
+
 def mock_open_corrupted_yaml(*args, **kwargs):
     """Mock open function that returns corrupted YAML"""
-    from unittest.mock import mock_open
-    return mock_open(read_data="invalid: yaml: content: [unclosed")(*args, **kwargs)
+    return _CORRUPTED_YAML_OPEN(*args, **kwargs)
 
 
 # Integration test that requires actual files
@@ -546,10 +482,6 @@ def mock_open_corrupted_yaml(*args, **kwargs):
 class TestIntegrationWithRealFiles:
     """Integration tests using real CSV files and templates"""
     
-    @pytest.fixture
-    def generator(self):
-        return ReportGenerator(language="en")
-    
     @pytest.fixture
     def real_csv_path(self):
         """Use actual sample CSV file if it exists"""
@@ -559,9 +491,8 @@ class TestIntegrationWithRealFiles:
         pytest.skip("Real CSV file not available for integration test")
     
     @pytest.fixture
-    def temp_output_dir(self):
-        with tempfile.TemporaryDirectory() as tmpdir:
-            yield Path(tmpdir)
+    def temp_output_dir(self, tmp_path):
+        return tmp_path
     
     @pytest.mark.slow
     def test_full_integration_report_generation(self, generator, real_csv_path, temp_output_dir):
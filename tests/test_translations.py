@@ -8,17 +8,18 @@ at module level which can be slow or unavailable in test environments.
 """
 
 import pytest
-import yaml
-from pathlib import Path
+from functools import lru_cache
 
-
-TRANSLATIONS_PATH = Path(__file__).parent.parent / "config" / "translations.yaml"
+from tests.conftest import load_raw_translations
 
 
+@lru_cache(maxsize=8)
 def load_translations(language: str) -> dict:
-    """Mirror of scripts.generate_clean_report.load_translations."""
-    with open(TRANSLATIONS_PATH, "r", encoding="utf-8") as f:
-        all_translations = yaml.safe_load(f)
+    """Mirror of scripts.generate_clean_report.load_translations.
+
+    Memoized per language; callers must not modify the returned dict.
+    """
+    all_translations = load_raw_translations()
 
     en_strings = all_translations.get("en", {})
 
@@ -33,14 +34,23 @@ def load_translations(language: str) -> dict:
 
 def make_t_function(translations: dict):
     """Mirror of scripts.generate_clean_report.make_t_function."""
-    def t(key: str, **kwargs) -> str:
+    @lru_cache(maxsize=1024)
+    def _format(key: str, items: tuple) -> str:
         value = translations.get(key, key)
-        if kwargs:
-            try:
-                value = value.format(**kwargs)
-            except (KeyError, IndexError):
-                pass
-        return value
+        try:
+            return value.format(**dict(items))
+        except (KeyError, IndexError):
+            return value
+
+    def t(key: str, **kwargs) -> str:
+        if not kwargs:
+            return translations.get(key, key)
+        items = tuple(sorted(kwargs.items()))
+        try:
+            hash(items)
+        except TypeError:
+            return _format.__wrapped__(key, items)
+        return _format(key, items)
     return t
 
 
@@ -49,32 +59,25 @@ def make_t_function(translations: dict):
 # ---------------------------------------------------------------------------
 
 class TestLoadTranslations:
-    def test_load_english(self):
+    def test_load_english(self, raw_yaml):
         result = load_translations("en")
         assert isinstance(result, dict)
         assert len(result) > 0
         assert "dysbiosis_index" in result
+        assert result == raw_yaml["en"]
 
-    def test_load_polish(self):
-        en = load_translations("en")
-        pl = load_translations("pl")
-        assert isinstance(pl, dict)
-        # Fallback should fill gaps — PL must have all EN keys
-        for key in en:
-            assert key in pl, f"Polish translations missing key: {key}"
-
-    def test_load_german(self):
-        en = load_translations("en")
-        de = load_translations("de")
-        assert isinstance(de, dict)
-        for key in en:
-            assert key in de, f"German translations missing key: {key}"
-
-    def test_unsupported_language_falls_back(self):
+    @pytest.mark.parametrize("lang", ["pl", "de"])
+    def test_load_with_fallback(self, lang, en_keys):
+        result = load_translations(lang)
+        assert isinstance(result, dict)
+        # Fallback should fill gaps — every EN key must be present
+        missing = en_keys - result.keys()
+        assert not missing, f"'{lang}' translations missing keys: {sorted(missing)}"
+
+    def test_unsupported_language_falls_back(self, raw_yaml):
         """load_translations('xx') returns EN strings (no crash)."""
-        en = load_translations("en")
         xx = load_translations("xx")
-        assert xx == en
+        assert xx == raw_yaml["en"]
 
 
 # ---------------------------------------------------------------------------
@@ -101,21 +104,20 @@ class TestMakeTFunction:
         result = t("page_x_of_y")
         assert isinstance(result, str)
 
+    def test_format_result_depends_on_kwargs(self, t):
+        assert t("page_x_of_y", current=1, total=5) == "Page 1 of 5"
+        assert t("page_x_of_y", total=5, current=2) == "Page 2 of 5"
+        assert t("page_x_of_y", current=1, total=5) == "Page 1 of 5"
+
+    def test_format_unhashable_kwarg(self, t):
+        assert t("page_x_of_y", current=[3], total=5) == "Page [3] of 5"
+
 
 # ---------------------------------------------------------------------------
 # translations.yaml integrity tests
 # ---------------------------------------------------------------------------
 
 class TestTranslationsYamlIntegrity:
-    @pytest.fixture(scope="class")
-    def raw_yaml(self):
-        with open(TRANSLATIONS_PATH, "r", encoding="utf-8") as f:
-            return yaml.safe_load(f)
-
-    @pytest.fixture(scope="class")
-    def en_keys(self, raw_yaml):
-        return set(raw_yaml.get("en", {}).keys())
-
     def test_all_languages_have_same_keys(self, raw_yaml, en_keys):
         """PL and DE key sets must be supersets of EN keys.
 
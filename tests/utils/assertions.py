@@ -5,24 +5,26 @@ from pathlib import Path
 from typing import Dict, List, Any, Union
 import re
 
+from tests.utils.helpers import find_missing_patterns
+
+# Basic scientific name pattern (Genus species)
+_SPECIES_RE = re.compile(r'^[A-Z][a-z]+ [a-z]+.*$')
+
+_VALID_PHYLA = frozenset({
+    'Actinomycetota', 'Bacillota', 'Bacteroidota', 'Pseudomonadota',
+    'Fibrobacterota', 'Verrucomicrobiota', 'Spirochaetota',
+    'Planctomycetota', 'Fusobacteriota'
+})
+
 def assert_valid_species_name(species_name: str):
     """Assert species name follows scientific naming convention"""
     assert isinstance(species_name, str), "Species name must be a string"
     assert len(species_name.strip()) > 0, "Species name cannot be empty"
-    
-    # Basic scientific name pattern (Genus species)
-    pattern = r'^[A-Z][a-z]+ [a-z]+.*$'
-    assert re.match(pattern, species_name.strip()), f"Invalid species name format: {species_name}"
+    assert _SPECIES_RE.match(species_name.strip()), f"Invalid species name format: {species_name}"
 
 def assert_valid_phylum_name(phylum_name: str):
     """Assert phylum name is valid"""
-    valid_phyla = {
-        'Actinomycetota', 'Bacillota', 'Bacteroidota', 'Pseudomonadota',
-        'Fibrobacterota', 'Verrucomicrobiota', 'Spirochaetota',
-        'Planctomycetota', 'Fusobacteriota'
-    }
-    
-    assert phylum_name in valid_phyla, f"Invalid phylum name: {phylum_name}"
+    assert phylum_name in _VALID_PHYLA, f"Invalid phylum name: {phylum_name}"
 
 def assert_percentage_sum_valid(percentages: List[float], tolerance: float = 1.0):
     """Assert percentages sum to approximately 100%"""
@@ -61,8 +63,8 @@ def assert_template_rendered_properly(rendered_content: str, expected_patterns:
     assert isinstance(rendered_content, str), "Rendered content must be a string"
     assert len(rendered_content.strip()) > 0, "Rendered content cannot be empty"
     
-    for pattern in expected_patterns:
-        assert pattern in rendered_content, f"Expected pattern not found: {pattern}"
+    missing = find_missing_patterns(rendered_content, expected_patterns)
+    assert not missing, f"Expected pattern not found: {missing[0]}"
 
 def assert_patient_info_complete(patient_info: Dict):
     """Assert patient information is complete"""
@@ -93,14 +95,14 @@ def assert_report_content_valid(content: str, language: str = 'en'):
     # Common patterns that should appear in any language
     common_patterns = ['%', 'DNA', 'RNA']  # Scientific notation should be consistent
     
-    for pattern in common_patterns:
-        assert pattern in content, f"Missing expected scientific notation: {pattern}"
+    missing = find_missing_patterns(content, common_patterns)
+    assert not missing, f"Missing expected scientific notation: {missing[0]}"
     
     # Language-specific patterns
     if language == 'en':
         english_patterns = ['Microbiome', 'Analysis', 'Results']
-        for pattern in english_patterns:
-            assert pattern in content, f"Missing English pattern: {pattern}"
+        missing = find_missing_patterns(content, english_patterns)
+        assert not missing, f"Missing English pattern: {missing[0]}"
 
 def assert_file_permissions_valid(file_path: Path):
     """Assert file has appropriate permissions"""
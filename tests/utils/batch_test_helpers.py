@@ -2,16 +2,19 @@
 Helper utilities for batch processor testing
 """
 
-import tempfile
-import shutil
+import csv
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import List, Dict, Optional
 from src.batch_processor import BatchConfig, BatchProcessor
 from src.data_models import PatientInfo
 
 
-def create_temp_batch_config(**overrides) -> BatchConfig:
-    """Create a temporary batch configuration for testing"""
+def create_temp_batch_config(tmp_path: Path, **overrides) -> BatchConfig:
+    """Create a batch configuration writing reports under tmp_path
+
+    Pass pytest's tmp_path fixture; pytest removes it, so no cleanup is needed.
+    """
     defaults = {
         'data_dir': Path('tests/fixtures/batch_data/valid_batch'),
         'language': 'en',
@@ -23,9 +26,7 @@ def create_temp_batch_config(**overrides) -> BatchConfig:
     }
     defaults.update(overrides)
     
-    # Create temporary reports directory
-    temp_dir = tempfile.mkdtemp()
-    defaults['reports_dir'] = Path(temp_dir) / 'reports'
+    defaults['reports_dir'] = Path(tmp_path) / 'reports'
     
     return BatchConfig(**defaults)
 
@@ -45,9 +46,11 @@ def create_test_csv_files(directory: Path, file_data: List[Dict]) -> List[Path]:
 
 
 def create_large_batch_files(directory: Path, count: int = 10) -> List[Path]:
-    """Create multiple CSV files for large batch testing"""
+    """Create multiple CSV files for large batch testing
+
+    Contents are built up front and written concurrently as raw bytes.
+    """
     directory.mkdir(parents=True, exist_ok=True)
-    created_files = []
     
     base_content = """species,barcode{},phylum,genus,family,class,order
 Streptomyces coelicolor,50,Actinomycetota,Streptomyces,Streptomycetaceae,Actinomycetes,Streptomycetales
@@ -58,15 +61,11 @@ Escherichia coli,200,Pseudomonadota,Escherichia,Enterobacteriaceae,Gammaproteoba
 Pseudomonas aeruginosa,150,Pseudomonadota,Pseudomonas,Pseudomonadaceae,Gammaproteobacteria,Pseudomonadales
 Fibrobacter succinogenes,100,Fibrobacterota,Fibrobacter,Fibrobacteraceae,Fibrobacteria,Fibrobacterales"""
     
-    for i in range(count):
-        filename = f"large_batch_sample_{i+1:02d}.csv"
-        file_path = directory / filename
-        barcode_num = f"{i+1:02d}"
-        content = base_content.format(barcode_num)
-        
-        with open(file_path, 'w') as f:
-            f.write(content)
-        created_files.append(file_path)
+    created_files = [directory / f"large_batch_sample_{i+1:02d}.csv" for i in range(count)]
+    contents = [base_content.format(f"{i+1:02d}").encode() for i in range(count)]
+    
+    with ThreadPoolExecutor(max_workers=max(1, min(8, count))) as executor:
+        list(executor.map(Path.write_bytes, created_files, contents))
     
     return created_files
 
@@ -109,13 +108,6 @@ def assert_batch_results(results: List[Dict], min_successful: int = 0, check_fil
     }
 
 
-def cleanup_temp_directories(*directories):
-    """Clean up temporary directories after tests"""
-    for directory in directories:
-        if directory and Path(directory).exists():
-            shutil.rmtree(directory, ignore_errors=True)
-
-
 def create_test_patient_info(name: str = "TestHorse", **overrides) -> PatientInfo:
     """Create test patient info with sensible defaults"""
     defaults = {
@@ -141,22 +133,34 @@ def validate_csv_file_format(file_path: Path) -> bool:
         return False
 
 
+def _positive(value: str) -> bool:
+    """Whether a CSV cell holds a number > 0 (blank cells count as missing)"""
+    try:
+        return float(value) > 0
+    except ValueError:
+        return False
+
+
 def count_species_in_csv(file_path: Path, barcode_column: str = None) -> int:
-    """Count number of species in CSV file"""
+    """Count number of species in CSV file
+
+    Streams rows with csv.reader; only the barcode column is converted.
+    """
     try:
-        import pandas as pd
-        df = pd.read_csv(file_path)
-        
-        # Auto-detect barcode column if not specified
-        if barcode_column is None:
-            barcode_columns = [col for col in df.columns if col.startswith('barcode')]
-            if barcode_columns:
-                barcode_column = barcode_columns[0]
-            else:
-                return len(df)
-        
-        # Count non-zero entries
-        return len(df[df[barcode_column] > 0]) if barcode_column in df.columns else len(df)
+        with open(file_path, newline='') as f:
+            reader = csv.reader(f)
+            header = next(reader)
+            rows = (row for row in reader if row)
+            
+            # Auto-detect barcode column if not specified
+            if barcode_column is None:
+                barcode_column = next((col for col in header if col.startswith('barcode')), None)
+            if barcode_column not in header:
+                return sum(1 for _ in rows)
+            
+            # Count non-zero entries
+            col_index = header.index(barcode_column)
+            return sum(1 for row in rows if _positive(row[col_index]))
     except Exception:
         return 0
 
@@ -1,7 +1,9 @@
 import csv
 import json
+import re
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Iterable, Pattern, Tuple
 
 def create_test_csv(data: List[Dict], output_path: Path):
     """Create a CSV file with test data"""
@@ -14,6 +16,25 @@ def create_test_csv(data: List[Dict], output_path: Path):
         writer.writeheader()
         writer.writerows(data)
 
+@lru_cache(maxsize=128)
+def _pattern_scanner(patterns: Tuple[str, ...]) -> Pattern:
+    """Compile a literal alternation, longest first so prefixes don't shadow"""
+    ordered = sorted(set(patterns), key=len, reverse=True)
+    return re.compile('|'.join(re.escape(p) for p in ordered))
+
+def find_missing_patterns(content: str, patterns: Iterable[str]) -> List[str]:
+    """Return the patterns not found in content, in their given order
+
+    Scans content once with a regex alternation instead of one substring
+    search per pattern. finditer matches don't overlap, so a pattern hidden
+    inside a longer match is re-checked with a plain substring test.
+    """
+    wanted = tuple(p for p in patterns if p)
+    if not wanted:
+        return []
+    found = set(m.group() for m in _pattern_scanner(wanted).finditer(content))
+    return [p for p in wanted if p not in found and p not in content]
+
 def load_test_data(filename: str) -> Any:
     """Load test data from JSON file"""
     path = Path(__file__).parent.parent / "fixtures" / filename
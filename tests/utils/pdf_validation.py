@@ -1,49 +1,132 @@
 """PDF validation utilities for testing"""
 
+from functools import lru_cache
 from pathlib import Path
+import mmap
+import os
 import subprocess
-from typing import Optional, List
+from typing import Optional, List, Tuple
 
-def validate_pdf_structure(pdf_path: Path) -> bool:
-    """Validate PDF file structure using basic checks"""
-    if not pdf_path.exists():
-        return False
-    
+from tests.utils.helpers import find_missing_patterns
+
+# PDFium extracts text in-process; the pdftotext binary remains the fallback
+try:
+    import pypdfium2 as pdfium
+    HAS_PDFIUM = True
+except ImportError:
+    HAS_PDFIUM = False
+
+def _check_structure(pdf_path: Path, size: int, header: Optional[bytes] = None) -> bool:
+    """Structure checks given a size already taken from stat()
+
+    Pass header when the leading bytes are already at hand (e.g. an mmap).
+    """
     if pdf_path.suffix.lower() != '.pdf':
         return False
     
     # Check minimum file size (PDF should be at least a few KB)
-    if pdf_path.stat().st_size < 1000:
+    if size < 1000:
         return False
     
-    # Check PDF header
+    # Check PDF header; raw fd read, no buffered file object for 8 bytes
+    if header is None:
+        try:
+            fd = os.open(pdf_path, os.O_RDONLY)
+            try:
+                header = os.read(fd, 8)
+            finally:
+                os.close(fd)
+        except OSError:
+            return False
+    
+    return header.startswith(b'%PDF-')
+
+def validate_pdf_structure(pdf_path: Path) -> bool:
+    """Validate PDF file structure using basic checks"""
     try:
-        with open(pdf_path, 'rb') as f:
-            header = f.read(8)
-            if not header.startswith(b'%PDF-'):
-                return False
-    except Exception:
+        st = pdf_path.stat()
+    except OSError:
         return False
     
-    return True
+    return _check_structure(pdf_path, st.st_size)
+
+PAGE_MARKER = b'/Type/Page'
+
+def _count_pages(mm: mmap.mmap) -> int:
+    """Simple page count - count '/Type/Page' occurrences in a mapped PDF"""
+    page_count = 0
+    pos = mm.find(PAGE_MARKER)
+    while pos != -1:
+        page_count += 1
+        pos = mm.find(PAGE_MARKER, pos + len(PAGE_MARKER))
+    return page_count if page_count > 0 else 1
 
 def count_pdf_pages(pdf_path: Path) -> Optional[int]:
-    """Count pages in PDF file using simple byte scanning"""
+    """Count pages in PDF file using simple byte scanning
+
+    The file is memory-mapped and scanned in place rather than read into memory.
+    """
     try:
         with open(pdf_path, 'rb') as f:
-            content = f.read()
-            # Simple page count - count '/Type/Page' occurrences
-            page_count = content.count(b'/Type/Page')
-            return page_count if page_count > 0 else 1
+            # mmap refuses zero-length files; an empty file has no markers
+            if f.seek(0, 2) == 0:
+                return 1
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                return _count_pages(mm)
     except Exception:
         return None
 
-def extract_pdf_text_simple(pdf_path: Path) -> Optional[str]:
-    """Extract text from PDF using simple method (fallback for testing)"""
+def _inspect_pdf(pdf_path: Path) -> Optional[Tuple[int, bool, Optional[int]]]:
+    """Return (size, valid_structure, page_count) from one stat and one mmap
+
+    None means the file does not exist; page_count is None if it can't be read.
+    """
+    try:
+        st = pdf_path.stat()
+    except OSError:
+        return None
+    
+    try:
+        with open(pdf_path, 'rb') as f:
+            if st.st_size == 0:
+                return 0, False, 1
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                valid = _check_structure(pdf_path, st.st_size, header=mm[:8])
+                return st.st_size, valid, _count_pages(mm)
+    except (OSError, ValueError):
+        return st.st_size, False, None
+
+def _pdfium_text(path_str: str) -> Optional[str]:
+    """Extract text with PDFium, pages separated by form feeds like pdftotext"""
+    try:
+        pdf = pdfium.PdfDocument(path_str)
+    except pdfium.PdfiumError:
+        return None
+    try:
+        pages = []
+        for page in pdf:
+            textpage = page.get_textpage()
+            pages.append(textpage.get_text_range())
+            textpage.close()
+            page.close()
+        return '\f'.join(pages)
+    except pdfium.PdfiumError:
+        return None
+    finally:
+        pdf.close()
+
+@lru_cache(maxsize=64)
+def _cached_pdf_text(path_str: str, mtime_ns: int) -> Optional[str]:
+    """Extract text once per (path, mtime); a rewritten PDF gets a new entry"""
+    if HAS_PDFIUM:
+        text = _pdfium_text(path_str)
+        if text is not None:
+            return text
+    
     try:
         # Try using pdftotext if available (common Linux tool)
         result = subprocess.run(
-            ['pdftotext', str(pdf_path), '-'], 
+            ['pdftotext', path_str, '-'], 
             capture_output=True, 
             text=True, 
             timeout=30
@@ -55,6 +138,14 @@ def extract_pdf_text_simple(pdf_path: Path) -> Optional[str]:
     
     return None
 
+def extract_pdf_text_simple(pdf_path: Path) -> Optional[str]:
+    """Extract text from PDF using simple method (fallback for testing)"""
+    try:
+        mtime_ns = Path(pdf_path).stat().st_mtime_ns
+    except OSError:
+        return None
+    return _cached_pdf_text(str(pdf_path), mtime_ns)
+
 def validate_pdf_contains_text(pdf_path: Path, expected_text: List[str]) -> bool:
     """Validate PDF contains expected text content"""
     text_content = extract_pdf_text_simple(pdf_path)
@@ -65,18 +156,15 @@ def validate_pdf_contains_text(pdf_path: Path, expected_text: List[str]) -> bool
     
     text_lower = text_content.lower()
     
-    for expected in expected_text:
-        if expected.lower() not in text_lower:
-            return False
-    
-    return True
+    return not find_missing_patterns(text_lower, [expected.lower() for expected in expected_text])
 
 def assert_pdf_valid_for_testing(pdf_path: Path, expected_pages: int = 5):
     """Assert PDF is valid for testing purposes"""
-    assert pdf_path.exists(), f"PDF file does not exist: {pdf_path}"
-    assert validate_pdf_structure(pdf_path), f"Invalid PDF structure: {pdf_path}"
+    inspected = _inspect_pdf(pdf_path)
+    assert inspected is not None, f"PDF file does not exist: {pdf_path}"
+    _, valid_structure, page_count = inspected
+    assert valid_structure, f"Invalid PDF structure: {pdf_path}"
     
-    page_count = count_pdf_pages(pdf_path)
     if page_count is not None:
         assert page_count >= expected_pages, f"Expected at least {expected_pages} pages, got {page_count}"
 
@@ -99,15 +187,18 @@ def assert_pdf_contains_microbiome_content(pdf_path: Path):
 def get_pdf_info(pdf_path: Path) -> dict:
     """Get basic PDF information for testing"""
     info = {
-        'exists': pdf_path.exists(),
+        'exists': False,
         'size_bytes': 0,
         'valid_structure': False,
         'page_count': None
     }
     
-    if info['exists']:
-        info['size_bytes'] = pdf_path.stat().st_size
-        info['valid_structure'] = validate_pdf_structure(pdf_path)
-        info['page_count'] = count_pdf_pages(pdf_path)
+    # One stat and one mapping serve every field
+    inspected = _inspect_pdf(pdf_path)
+    if inspected is None:
+        return info
+    
+    info['exists'] = True
+    info['size_bytes'], info['valid_structure'], info['page_count'] = inspected
     
     return info
\ No newline at end of file